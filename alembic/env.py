@@ -9,9 +9,11 @@ from alembic import context
 from app.db.base import Base
 from app.models.region import Region
 from app.models.city import City
+from app.models.location import Location, LocationClosure
 from app.models.patient import Patient
 from app.models.medical_card import MedicalCard
 from app.models.user import User
+from app.models.session import UserSession
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
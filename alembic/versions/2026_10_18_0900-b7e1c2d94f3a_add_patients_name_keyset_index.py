@@ -0,0 +1,26 @@
+"""Add patients name keyset index
+
+Revision ID: b7e1c2d94f3a
+Revises: 4f3cfad0cd7f
+Create Date: 2026-10-18 09:00:12.418532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c2d94f3a'
+down_revision: Union[str, None] = '4f3cfad0cd7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_patients_name_keyset', 'patients', ['last_name', 'first_name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_name_keyset', table_name='patients')
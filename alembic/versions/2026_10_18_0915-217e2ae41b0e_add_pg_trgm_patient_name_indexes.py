@@ -0,0 +1,43 @@
+"""Add pg_trgm patient name indexes
+
+Revision ID: 217e2ae41b0e
+Revises: b7e1c2d94f3a
+Create Date: 2026-10-18 09:15:47.902311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '217e2ae41b0e'
+down_revision: Union[str, None] = 'b7e1c2d94f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Serve ILIKE '%x%' substring search
+    for column in ("first_name", "last_name", "middle_name"):
+        op.create_index(
+            f"ix_patients_{column}_trgm", "patients", [column], unique=False,
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+        )
+
+    # Serve fuzzy full name search (`token <% full_name`).
+    # Expression must match PATIENT_FULL_NAME in app/models/patient.py
+    op.execute(
+        "CREATE INDEX ix_patients_full_name_trgm ON patients USING gin "
+        "((last_name || ' ' || first_name || ' ' || coalesce(middle_name, '')) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_full_name_trgm', table_name='patients')
+    for column in ("middle_name", "last_name", "first_name"):
+        op.drop_index(f"ix_patients_{column}_trgm", table_name='patients')
+    # pg_trgm extension is left installed: other objects may depend on it
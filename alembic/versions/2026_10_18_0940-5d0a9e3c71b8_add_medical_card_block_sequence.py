@@ -0,0 +1,27 @@
+"""Add medical card block sequence
+
+Revision ID: 5d0a9e3c71b8
+Revises: 217e2ae41b0e
+Create Date: 2026-10-18 09:40:05.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0a9e3c71b8'
+down_revision: Union[str, None] = '217e2ae41b0e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Block index sequence for app/utils/card_allocator.py (one nextval per block)
+    op.execute("CREATE SEQUENCE medical_card_block_seq MINVALUE 0 START WITH 0")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE medical_card_block_seq")
@@ -0,0 +1,27 @@
+"""Add location catalog version sequence
+
+Revision ID: 8e3f6b2a9c14
+Revises: 5d0a9e3c71b8
+Create Date: 2026-10-18 10:00:12.408317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f6b2a9c14'
+down_revision: Union[str, None] = '5d0a9e3c71b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Location catalog version, bumped after each regions/cities import
+    op.execute("CREATE SEQUENCE location_catalog_version_seq")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE location_catalog_version_seq")
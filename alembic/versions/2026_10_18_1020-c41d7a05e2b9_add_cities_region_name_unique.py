@@ -0,0 +1,43 @@
+"""Add unique (region_id, name) constraint on cities
+
+Revision ID: c41d7a05e2b9
+Revises: 8e3f6b2a9c14
+Create Date: 2026-10-18 10:20:47.931526
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7a05e2b9'
+down_revision: Union[str, None] = '8e3f6b2a9c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge duplicate cities of a region into the oldest one before adding the constraint
+    op.execute("""
+        WITH duplicates AS (
+            SELECT id, min(id) OVER (PARTITION BY region_id, name) AS keep_id
+            FROM cities
+        )
+        UPDATE patients SET city_id = duplicates.keep_id
+        FROM duplicates
+        WHERE patients.city_id = duplicates.id AND duplicates.id <> duplicates.keep_id
+    """)
+    op.execute("""
+        DELETE FROM cities
+        USING cities AS kept
+        WHERE cities.region_id = kept.region_id
+          AND cities.name = kept.name
+          AND cities.id > kept.id
+    """)
+    op.create_unique_constraint('uq_cities_region_id_name', 'cities', ['region_id', 'name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_cities_region_id_name', 'cities', type_='unique')
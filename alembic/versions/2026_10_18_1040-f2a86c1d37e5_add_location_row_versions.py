@@ -0,0 +1,29 @@
+"""Add catalog version columns to regions and cities
+
+Revision ID: f2a86c1d37e5
+Revises: c41d7a05e2b9
+Create Date: 2026-10-18 10:40:26.553890
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a86c1d37e5'
+down_revision: Union[str, None] = 'c41d7a05e2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows belong to version 0; imports stamp rows with nextval('location_catalog_version_seq')
+    op.add_column('regions', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('cities', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('cities', 'version')
+    op.drop_column('regions', 'version')
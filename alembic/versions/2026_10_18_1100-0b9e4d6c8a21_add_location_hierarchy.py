@@ -0,0 +1,91 @@
+"""Add location hierarchy with closure table
+
+Revision ID: 0b9e4d6c8a21
+Revises: f2a86c1d37e5
+Create Date: 2026-10-18 11:00:38.264019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4d6c8a21'
+down_revision: Union[str, None] = 'f2a86c1d37e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'locations',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('level', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('region_id', sa.Integer(), nullable=True),
+        sa.Column('city_id', sa.Integer(), nullable=True),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['parent_id'], ['locations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['city_id'], ['cities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('parent_id', 'name', name='uq_locations_parent_id_name'),
+        sa.UniqueConstraint('region_id'),
+        sa.UniqueConstraint('city_id'),
+    )
+    op.create_index(op.f('ix_locations_id'), 'locations', ['id'], unique=False)
+
+    op.create_table(
+        'location_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['locations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['locations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index('ix_location_closure_descendant_id', 'location_closure', ['descendant_id'], unique=False)
+
+    op.add_column('patients', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'patients_location_id_fkey', 'patients', 'locations', ['location_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_patients_location_id'), 'patients', ['location_id'], unique=False)
+
+    # Regions become region nodes, cities become district nodes
+    op.execute("""
+        INSERT INTO locations (parent_id, level, name, region_id, version)
+        SELECT NULL, 'region', name, id, version FROM regions ORDER BY id
+    """)
+    op.execute("""
+        INSERT INTO locations (parent_id, level, name, city_id, version)
+        SELECT locations.id, 'district', cities.name, cities.id, cities.version
+        FROM cities JOIN locations ON locations.region_id = cities.region_id
+        ORDER BY cities.id
+    """)
+    op.execute("""
+        INSERT INTO location_closure (ancestor_id, descendant_id, depth)
+        SELECT id, id, 0 FROM locations
+        UNION ALL
+        SELECT parent_id, id, 1 FROM locations WHERE parent_id IS NOT NULL
+    """)
+    op.execute("""
+        UPDATE patients SET location_id = coalesce(
+            (SELECT id FROM locations WHERE locations.city_id = patients.city_id),
+            (SELECT id FROM locations WHERE locations.region_id = patients.region_id)
+        )
+        WHERE region_id IS NOT NULL OR city_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_patients_location_id'), table_name='patients')
+    op.drop_constraint('patients_location_id_fkey', 'patients', type_='foreignkey')
+    op.drop_column('patients', 'location_id')
+    op.drop_index('ix_location_closure_descendant_id', table_name='location_closure')
+    op.drop_table('location_closure')
+    op.drop_index(op.f('ix_locations_id'), table_name='locations')
+    op.drop_table('locations')
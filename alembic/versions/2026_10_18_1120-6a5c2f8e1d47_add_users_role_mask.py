@@ -0,0 +1,54 @@
+"""Add users role bitmask with per-role partial indexes
+
+Revision ID: 6a5c2f8e1d47
+Revises: 0b9e4d6c8a21
+Create Date: 2026-10-18 11:20:09.731542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a5c2f8e1d47'
+down_revision: Union[str, None] = '0b9e4d6c8a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match ROLE_BITS in app/utils/roles.py
+ROLE_BITS = {
+    'manager': 1,
+    'shifokor': 2,
+    'amaliyot_hamshirasi': 4,
+    'royhatga_oluvchi': 8,
+    'patronaj_hamshirasi': 16,
+}
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('role_mask', sa.Integer(), server_default='0', nullable=False))
+
+    bits = ", ".join(f"('{role}', {bit})" for role, bit in ROLE_BITS.items())
+    op.execute(f"""
+        UPDATE users SET role_mask = coalesce((
+            SELECT bit_or(bits.bit)
+            FROM unnest(users.roles) AS user_role(name)
+            JOIN (VALUES {bits}) AS bits(role, bit) ON bits.role = user_role.name
+        ), 0)
+    """)
+
+    op.create_index('ix_users_name_keyset', 'users', ['full_name', 'id'], unique=False)
+    for role, bit in ROLE_BITS.items():
+        op.create_index(
+            f'ix_users_role_{role}', 'users', ['full_name', 'id'], unique=False,
+            postgresql_where=sa.text(f'(role_mask & {bit}) <> 0'),
+        )
+
+
+def downgrade() -> None:
+    for role in ROLE_BITS:
+        op.drop_index(f'ix_users_role_{role}', table_name='users')
+    op.drop_index('ix_users_name_keyset', table_name='users')
+    op.drop_column('users', 'role_mask')
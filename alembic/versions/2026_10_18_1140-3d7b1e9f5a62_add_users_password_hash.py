@@ -0,0 +1,27 @@
+"""Add users password_hash for bcrypt password migration
+
+Revision ID: 3d7b1e9f5a62
+Revises: 6a5c2f8e1d47
+Create Date: 2026-10-18 11:40:27.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7b1e9f5a62'
+down_revision: Union[str, None] = '6a5c2f8e1d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled on each user's next successful login (see AuthService.login)
+    op.add_column('users', sa.Column('password_hash', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'password_hash')
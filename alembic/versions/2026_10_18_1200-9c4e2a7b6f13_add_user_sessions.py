@@ -0,0 +1,45 @@
+"""Add user_sessions for refresh tokens and revocation
+
+Revision ID: 9c4e2a7b6f13
+Revises: 3d7b1e9f5a62
+Create Date: 2026-10-18 12:00:41.265093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7b6f13'
+down_revision: Union[str, None] = '3d7b1e9f5a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_sessions',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('refresh_token_hash', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('refresh_token_hash'),
+    )
+    op.create_index(op.f('ix_user_sessions_user_id'), 'user_sessions', ['user_id'], unique=False)
+    op.create_index(
+        'ix_user_sessions_revoked_at', 'user_sessions', ['revoked_at'], unique=False,
+        postgresql_where=sa.text('revoked_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_sessions_revoked_at', table_name='user_sessions')
+    op.drop_index(op.f('ix_user_sessions_user_id'), table_name='user_sessions')
+    op.drop_table('user_sessions')
@@ -1,9 +1,14 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-
-# Re-export get_db for convenience
-async def get_database() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session dependency."""
-    async for session in get_db():
-        yield session
+from fastapi import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.session import get_db, get_read_db, replica_router
+
+# Request-scoped unit of work (one commit per request)
+get_database = get_db
+
+# Read-only endpoints (may be served by the read replica)
+get_read_database = get_read_db
+
+
+def get_read_session_factory(request: Request) -> async_sessionmaker:
+    """Session factory for read-only work outliving the request dependencies (streaming)."""
+    return replica_router.session_factory(request)
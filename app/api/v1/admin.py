@@ -1,20 +1,35 @@
-from fastapi import APIRouter, Depends, status
+import io
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_database
+from app.db.query_budget import endpoint_budget
 from app.services.location import LocationService
+from app.services.medical_card import MedicalCardService
+from app.services.patient_import import PatientImportService, detect_import_format
+from app.schemas.patient import PatientImportResult
+from app.schemas.medical_card import MedicalCardUtilization
+from app.schemas.location import LocationCreate, LocationResponse, LocationImportResult
+from app.schemas.database import PoolStats, ReplicaStatus, RouteQueryStats
 from app.core.security import verify_admin_credentials
+from app.db.instrumentation import sql_stats
+from app.db.pool import pool_stats
+from app.db.session import engine, replica_engine, replica_router
+from app.core.routing import ModelResponseRoute
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=ModelResponseRoute)
 
 
-@router.post("/import-regions", status_code=status.HTTP_200_OK)
+@router.post("/import-regions", status_code=status.HTTP_200_OK, response_model=LocationImportResult)
+@endpoint_budget(10)
 async def import_regions(
     db: AsyncSession = Depends(get_database),
     _: bool = Depends(verify_admin_credentials)
 ):
     """
-    Import regions and cities from JSON file (one-time admin operation).
-    This will clear existing regions/cities and import fresh data.
+    Import regions and cities from JSON file.
+    Only new regions/cities are added; existing IDs are kept and nothing is deleted.
+    Regions/cities missing from the file are reported in the response.
 
     Requires admin authentication (username: admin, password: admin123)
     """
@@ -25,3 +40,106 @@ async def import_regions(
 
     result = await service.import_regions_from_json(json_file_path)
     return result
+
+
+@router.post("/locations", status_code=status.HTTP_201_CREATED, response_model=LocationResponse)
+@endpoint_budget(3)
+async def create_location(
+    location_data: LocationCreate,
+    db: AsyncSession = Depends(get_database),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Create location hierarchy node (e.g. a mahalla under a district).
+
+    Requires admin authentication.
+    """
+    service = LocationService(db)
+    return await service.create_location(location_data)
+
+
+@router.get("/medical-cards/utilization", response_model=MedicalCardUtilization)
+@endpoint_budget(2)
+async def medical_card_utilization(
+    db: AsyncSession = Depends(get_database),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Medical card number space utilization (capacity, issued, reserved blocks).
+
+    Requires admin authentication.
+    """
+    service = MedicalCardService(db)
+    return await service.get_utilization()
+
+
+@router.get("/db/pool", response_model=list[PoolStats])
+async def database_pool_stats(
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Database connection pool gauges (checked out, overflow, idle), checkout
+    time histogram, timeouts and pre-ping failures.
+
+    Values are per worker process: the one that served this request.
+    Requires admin authentication.
+    """
+    stats = [pool_stats("primary", engine)]
+    if replica_engine is not None:
+        stats.append(pool_stats("replica", replica_engine))
+    return stats
+
+
+@router.get("/db/replica", response_model=ReplicaStatus)
+async def database_replica_status(
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Read replica routing state: whether reads currently go to the replica and its lag.
+
+    Requires admin authentication.
+    """
+    return replica_router.status()
+
+
+@router.get("/db/queries", response_model=list[RouteQueryStats])
+async def database_query_stats(
+    reset: bool = Query(False, description="Clear the totals after reading them"),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    SQL statements per route: count, database time and slowest statement,
+    most database time first. Finds round-trip-heavy handlers.
+
+    Values are per worker process: the one that served this request.
+    Requires admin authentication.
+    """
+    stats = sql_stats.snapshot()
+    if reset:
+        sql_stats.clear()
+    return stats
+
+
+@router.post("/patients/import", response_model=PatientImportResult)
+async def import_patients(
+    file: UploadFile = File(..., description="CSV (with header) or JSONL file of patients"),
+    import_format: Optional[Literal["csv", "jsonl"]] = Query(
+        None, alias="format", description="File format (detected from file name if omitted)"
+    ),
+    db: AsyncSession = Depends(get_database),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Bulk import patients (e.g. migration from legacy clinic systems).
+
+    Columns / keys: first_name, last_name, middle_name, birth_date, gender,
+    phone, region_id, city_id, address. Medical cards are generated
+    automatically. Returns per-row errors with source line numbers.
+
+    Requires admin authentication.
+    """
+    service = PatientImportService(db)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig")
+    return await service.import_patients(
+        stream, import_format or detect_import_format(file.filename or "")
+    )
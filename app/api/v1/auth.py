@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_database
+from app.db.query_budget import endpoint_budget
+from app.core.security import CurrentUser, get_current_user
 from app.services.auth import AuthService
-from app.schemas.auth import LoginRequest, LoginResponse
+from app.schemas.auth import LoginRequest, LoginResponse, RefreshRequest, TokenResponse
+from app.core.routing import ModelResponseRoute
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=ModelResponseRoute)
 
 
 @router.post("/login", response_model=LoginResponse)
+@endpoint_budget(5)
 async def login(
     login_data: LoginRequest,
     db: AsyncSession = Depends(get_database)
@@ -20,9 +24,38 @@ async def login(
     - password: 6-digit password
 
     Returns:
-    - access_token: JWT token for authentication
+    - access_token: Short-lived JWT token for authentication
+    - refresh_token: Token for POST /auth/refresh
     - token_type: Bearer
     - user: User information (id, full_name, jshshir, roles, phone)
     """
     service = AuthService(db)
     return await service.login(login_data)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+@endpoint_budget(2)
+async def refresh(
+    refresh_data: RefreshRequest,
+    db: AsyncSession = Depends(get_database)
+):
+    """
+    Get a new access token with a refresh token.
+
+    The refresh token is single-use: the response carries its replacement.
+    """
+    service = AuthService(db)
+    return await service.refresh(refresh_data.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@endpoint_budget(2)
+async def logout(
+    db: AsyncSession = Depends(get_database),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Revoke current session (access and refresh tokens) on all workers.
+    """
+    service = AuthService(db)
+    await service.logout(user.session_id)
@@ -1,26 +1,56 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.api.deps import get_database
+from app.api.deps import get_read_database
+from app.db.query_budget import endpoint_budget
 from app.services.location import LocationService
-from app.schemas.location import RegionResponse, RegionWithCities, CityResponse
+from app.schemas.location import (
+    RegionResponse, RegionWithCities, CityResponse, LocationResponse, LocationTree
+)
+from app.core.responses import PrecomputedJSON, RawJSONResponse, precomputed_response
+from app.core.routing import ModelResponseRoute
 
-router = APIRouter(prefix="/locations", tags=["Locations"])
+router = APIRouter(prefix="/locations", tags=["Locations"], route_class=ModelResponseRoute)
+
+
+@router.get("/tree", response_model=LocationTree)
+@endpoint_budget(0)
+async def get_location_tree(
+    request: Request,
+    since_version: Optional[int] = Query(
+        None, ge=0, description="Return only regions/cities added after this catalog version"
+    ),
+    db: AsyncSession = Depends(get_read_database)
+):
+    """
+    Get all regions with their cities in one response.
+
+    Clients keep `version` from the response and pass it as `since_version`
+    next time to receive only what was added since (`full` is false then).
+    """
+    service = LocationService(db)
+    tree = await service.get_location_tree(since_version)
+    if isinstance(tree, PrecomputedJSON):
+        return precomputed_response(request, tree)
+    return RawJSONResponse(tree)
 
 
 @router.get("/regions/", response_model=list[RegionResponse])
+@endpoint_budget(0)
 async def get_regions(
-    db: AsyncSession = Depends(get_database)
+    request: Request,
+    db: AsyncSession = Depends(get_read_database)
 ):
-    """Get all regions."""
+    """Get all regions (supports ETag / If-None-Match and gzip/br)."""
     service = LocationService(db)
-    return await service.get_all_regions()
+    return precomputed_response(request, await service.get_all_regions())
 
 
 @router.get("/regions/{region_id}", response_model=RegionResponse)
+@endpoint_budget(0)
 async def get_region(
     region_id: int,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_read_database)
 ):
     """Get region by ID."""
     service = LocationService(db)
@@ -28,23 +58,48 @@ async def get_region(
 
 
 @router.get("/regions/{region_id}/cities/", response_model=list[CityResponse])
+@endpoint_budget(0)
 async def get_region_cities(
     region_id: int,
-    db: AsyncSession = Depends(get_database)
+    request: Request,
+    db: AsyncSession = Depends(get_read_database)
 ):
-    """Get all cities in a region."""
+    """Get all cities in a region (supports ETag / If-None-Match and gzip/br)."""
     service = LocationService(db)
-    return await service.get_cities_by_region(region_id)
+    return precomputed_response(request, await service.get_cities_by_region(region_id))
 
 
 @router.get("/cities/", response_model=list[CityResponse])
+@endpoint_budget(0)
 async def get_cities_by_region(
+    request: Request,
     region_id: Optional[int] = Query(None, description="Filter cities by region ID"),
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_read_database)
 ):
-    """Get cities filtered by region."""
+    """Get cities, optionally filtered by region (supports ETag / If-None-Match and gzip/br)."""
     service = LocationService(db)
     if region_id:
-        return await service.get_cities_by_region(region_id)
-    # If no region_id, return empty list (or all cities if you prefer)
-    return []
+        return precomputed_response(request, await service.get_cities_by_region(region_id))
+    return precomputed_response(request, await service.get_all_cities())
+
+
+@router.get("/nodes/{location_id}", response_model=LocationResponse)
+@endpoint_budget(0)
+async def get_location(
+    location_id: int,
+    db: AsyncSession = Depends(get_read_database)
+):
+    """Get location hierarchy node (region, district or mahalla) by ID."""
+    service = LocationService(db)
+    return await service.get_location(location_id)
+
+
+@router.get("/nodes/{location_id}/children", response_model=list[LocationResponse])
+@endpoint_budget(0)
+async def get_location_children(
+    location_id: int,
+    db: AsyncSession = Depends(get_read_database)
+):
+    """Get direct children of a location hierarchy node."""
+    service = LocationService(db)
+    return await service.get_location_children(location_id)
@@ -1,35 +1,123 @@
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from app.api.deps import get_database
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Literal, Optional
+from app.api.deps import get_database, get_read_database, get_read_session_factory
+from app.db.query_budget import endpoint_budget
 from app.services.patient import PatientService
-from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse, PatientListResponse
+from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse, PatientPage
+from app.core.config import settings
+from app.core.responses import RawJSONResponse
+from app.core.security import CurrentUser, require_roles
+from app.schemas.user import UserRole
+from app.core.routing import ModelResponseRoute
 
-router = APIRouter(prefix="/patients", tags=["Patients"])
+router = APIRouter(prefix="/patients", tags=["Patients"], route_class=ModelResponseRoute)
 
+# RBAC: any staff member works with patients; deleting and bulk export are for managers
+require_staff = require_roles(*UserRole)
+require_manager = require_roles(UserRole.MANAGER)
 
-@router.get("/", response_model=list[PatientListResponse])
+
+@router.get("/", response_model=PatientPage)
+@endpoint_budget(2)
 async def get_patients(
     search: Optional[str] = Query(None, description="Search by first name, last name, or middle name"),
+    search_mode: Literal["contains", "fuzzy"] = Query(
+        "contains", description="contains: substring match; fuzzy: typo-tolerant, ranked by similarity"
+    ),
+    min_similarity: Optional[float] = Query(
+        None, ge=0, le=1, description="Fuzzy search similarity threshold (default from settings)"
+    ),
     region_id: Optional[int] = Query(None, description="Filter by region ID"),
     city_id: Optional[int] = Query(None, description="Filter by city ID"),
+    location_id: Optional[int] = Query(
+        None, description="Filter by location node, including every level below it"
+    ),
     medical_card_number: Optional[str] = Query(None, description="Search by medical card number"),
-    db: AsyncSession = Depends(get_database)
+    limit: int = Query(
+        settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT,
+        description="Page size"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor or prev_cursor from previous page"),
+    sort: Literal["name", "id"] = Query("name", description="Sort by (last_name, first_name, id) or by id"),
+    db: AsyncSession = Depends(get_read_database),
+    _: CurrentUser = Depends(require_staff)
 ):
-    """Get all patients with optional filters."""
+    """
+    Get patients page with optional filters.
+
+    Uses keyset (cursor) pagination: pass `next_cursor` / `prev_cursor`
+    from the response as `cursor` to move between pages.
+    Fuzzy search results are ordered by similarity, `sort` is ignored.
+    """
     service = PatientService(db)
-    return await service.get_all_patients(
+    page = await service.get_patients_page(
+        limit=limit,
+        sort=sort,
+        cursor=cursor,
         search=search,
+        search_mode=search_mode,
+        min_similarity=min_similarity,
         region_id=region_id,
         city_id=city_id,
+        location_id=location_id,
         medical_card_number=medical_card_number
     )
+    return RawJSONResponse(page)
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@router.get("/export")
+async def export_patients(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    search: Optional[str] = Query(None, description="Search by first name, last name, or middle name"),
+    region_id: Optional[int] = Query(None, description="Filter by region ID"),
+    city_id: Optional[int] = Query(None, description="Filter by city ID"),
+    location_id: Optional[int] = Query(
+        None, description="Filter by location node, including every level below it"
+    ),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+    _: CurrentUser = Depends(require_manager)
+):
+    """
+    Stream patient registry export as NDJSON or CSV.
+
+    Rows are read from a server-side cursor and written as they arrive,
+    so memory stays bounded regardless of export size.
+    """
+    async def export_stream():
+        # Own session: the response body is produced after request dependencies are closed
+        # Budget covers the body: one server-side cursor, however many rows
+        async with endpoint_budget(1, "export_patients"), session_factory() as session:
+            service = PatientService(session)
+            async for chunk in service.export_patients(
+                export_format=export_format,
+                search=search,
+                region_id=region_id,
+                city_id=city_id,
+                location_id=location_id
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        export_stream(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="patients.{export_format}"'},
+    )
 
 
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
+@endpoint_budget(2)
 async def create_patient(
     patient_data: PatientCreate,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_database),
+    _: CurrentUser = Depends(require_staff)
 ):
     """Create new patient (automatically generates medical card)."""
     service = PatientService(db)
@@ -37,9 +125,11 @@ async def create_patient(
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
+@endpoint_budget(2)
 async def get_patient(
     patient_id: int,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_read_database),
+    _: CurrentUser = Depends(require_staff)
 ):
     """Get patient by ID."""
     service = PatientService(db)
@@ -47,10 +137,12 @@ async def get_patient(
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
+@endpoint_budget(3)
 async def update_patient(
     patient_id: int,
     patient_data: PatientUpdate,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_database),
+    _: CurrentUser = Depends(require_staff)
 ):
     """Update patient by ID."""
     service = PatientService(db)
@@ -58,10 +150,12 @@ async def update_patient(
 
 
 @router.patch("/{patient_id}", response_model=PatientResponse)
+@endpoint_budget(3)
 async def partial_update_patient(
     patient_id: int,
     patient_data: PatientUpdate,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_database),
+    _: CurrentUser = Depends(require_staff)
 ):
     """Partially update patient by ID."""
     service = PatientService(db)
@@ -69,9 +163,11 @@ async def partial_update_patient(
 
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
+@endpoint_budget(4)
 async def delete_patient(
     patient_id: int,
-    db: AsyncSession = Depends(get_database)
+    db: AsyncSession = Depends(get_database),
+    _: CurrentUser = Depends(require_manager)
 ):
     """Delete patient by ID (hard delete)."""
     service = PatientService(db)
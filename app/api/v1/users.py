@@ -1,29 +1,47 @@
-from fastapi import APIRouter, Depends, status
+import io
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_database
+from app.api.deps import get_database, get_read_database
+from app.db.query_budget import endpoint_budget
 from app.services.user import UserService
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
+from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserRole, UserPage, UserImportResult
+from app.core.config import settings
 from app.core.security import verify_admin_credentials
+from app.core.responses import RawJSONResponse
+from app.core.routing import ModelResponseRoute
 
-router = APIRouter(prefix="/admin/users", tags=["Admin - Users"])
+router = APIRouter(prefix="/admin/users", tags=["Admin - Users"], route_class=ModelResponseRoute)
 
 
-@router.get("/", response_model=list[UserListResponse])
+@router.get("/", response_model=UserPage)
+@endpoint_budget(1)
 async def get_all_users(
-    db: AsyncSession = Depends(get_database),
+    role: Optional[list[UserRole]] = Query(None, description="Only users with any of these roles"),
+    limit: int = Query(
+        settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT,
+        description="Page size"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor or prev_cursor from previous page"),
+    db: AsyncSession = Depends(get_read_database),
     _: bool = Depends(verify_admin_credentials)
 ):
     """
-    Get all users (admin only).
-    Returns full_name, roles, jshshir, password, phone for all users.
+    Get users page (admin only), ordered by full name.
+    Returns full_name, roles, jshshir, password, phone for each user.
+
+    Filter by role with `?role=shifokor` (repeat for several roles).
+    Uses keyset (cursor) pagination like the patient list.
 
     Requires admin authentication.
     """
     service = UserService(db)
-    return await service.get_all_users()
+    page = await service.get_users_page(limit=limit, cursor=cursor, roles=role)
+    return RawJSONResponse(page)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@endpoint_budget(1)
 async def create_user(
     user_data: UserCreate,
     db: AsyncSession = Depends(get_database),
@@ -47,10 +65,33 @@ async def create_user(
     return await service.create_user(user_data)
 
 
+@router.post("/import", response_model=UserImportResult)
+@endpoint_budget(1)
+async def import_users(
+    file: UploadFile = File(..., description="Staff roster CSV (with header)"),
+    db: AsyncSession = Depends(get_database),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Provision a staff roster in one statement (admin only).
+
+    Columns: full_name, jshshir, roles (separated by ";"), gender,
+    birth_date, phone. Existing users (same jshshir) get the new roles
+    added; new users get a generated 6-digit password, returned in
+    created_users.
+
+    Requires admin authentication.
+    """
+    service = UserService(db)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig")
+    return await service.import_roster(stream)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
+@endpoint_budget(1)
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_database),
+    db: AsyncSession = Depends(get_read_database),
     _: bool = Depends(verify_admin_credentials)
 ):
     """
@@ -63,6 +104,7 @@ async def get_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
+@endpoint_budget(5)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
@@ -79,6 +121,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@endpoint_budget(4)
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_database),
@@ -91,3 +134,21 @@ async def delete_user(
     """
     service = UserService(db)
     await service.delete_user(user_id)
+
+
+@router.post("/{user_id}/revoke-sessions")
+@endpoint_budget(3)
+async def revoke_user_sessions(
+    user_id: int,
+    db: AsyncSession = Depends(get_database),
+    _: bool = Depends(verify_admin_credentials)
+):
+    """
+    Revoke all login sessions of user (admin only).
+
+    Access and refresh tokens of the user stop working on all workers.
+    Requires admin authentication.
+    """
+    service = UserService(db)
+    await service.get_user_by_id(user_id)
+    return {"revoked": await service.revoke_sessions(user_id)}
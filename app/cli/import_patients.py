@@ -0,0 +1,37 @@
+"""
+Bulk import patients from a CSV or JSONL file.
+
+Usage:
+    python -m app.cli.import_patients patients.csv
+    python -m app.cli.import_patients patients.jsonl --format jsonl
+"""
+
+import argparse
+import asyncio
+import sys
+from app.db.session import AsyncSessionLocal
+from app.services.patient_import import PatientImportService, detect_import_format
+
+
+async def run(path: str, import_format: str) -> int:
+    async with AsyncSessionLocal() as session:
+        service = PatientImportService(session)
+        with open(path, "r", encoding="utf-8-sig", newline="") as stream:
+            result = await service.import_patients(stream, import_format)
+
+    print(result.model_dump_json(indent=2))
+    return 0 if not result.failed else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import patients from CSV or JSONL")
+    parser.add_argument("path", help="Path to CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from file name)")
+    args = parser.parse_args()
+
+    import_format = args.format or detect_import_format(args.path)
+    sys.exit(asyncio.run(run(args.path, import_format)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Response compression (gzip, brotli) negotiated by Accept-Encoding.
+
+CompressionMiddleware compresses responses whose content type is
+compressible (JSON, NDJSON, CSV, text...). It leaves a response alone if:
+- it already has a Content-Encoding (e.g. precomputed location bodies);
+- it is marked Cache-Control: no-transform;
+- it is a complete body smaller than COMPRESSION_MIN_SIZE bytes.
+
+Streaming responses (the patient export) are compressed chunk by chunk
+with a sync flush after each chunk, so clients still receive rows as
+they are produced. Chunks and bodies of COMPRESSION_OFFLOAD_SIZE bytes
+or more are compressed in a worker thread, so that other requests on the
+event loop are not blocked while a large page is compressed.
+"""
+
+import zlib
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.responses import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip is offered when brotli is not installed
+    brotli = None
+
+# Content types worth compressing (prefix match on the media type)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+
+
+class StreamCompressor:
+    """Incremental gzip or brotli compressor."""
+
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data and flush it, so it can be sent right away."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last data and end the stream."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Compresses compressible responses for clients that accept gzip or br."""
+
+    def __init__(
+        self,
+        app,
+        min_size: int = 1024,
+        offload_size: int = 128 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.codings = ["br", "gzip"] if brotli else ["gzip"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        coding = choose_encoding(accept_encoding, [*self.codings, "identity"])
+        start_message: Optional[dict] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def run(func, data: bytes) -> bytes:
+            if len(data) >= self.offload_size:
+                return await run_in_threadpool(func, data)
+            return func(data)
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if not self._compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if coding == "identity":
+                    passthrough = True
+                    await send(message)
+                    return
+                # Decided by the first body chunk
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.min_size:
+                    # Complete and small: not worth it
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = StreamCompressor(coding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = coding
+                del headers["Content-Length"]
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"  # Same content, different bytes
+
+                if not more_body:
+                    body = await run(compressor.finish, body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                await send(start_message)
+                start_message = None
+
+            if more_body:
+                compressed = await run(compressor.compress, body) if body else b""
+            else:
+                compressed = await run(compressor.finish, body)
+            if compressed or not more_body:
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import HTTPException, status
 
 
@@ -58,3 +59,12 @@ def internal_server_exception(message: str = "Internal server error"):
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail=message
     )
+
+
+def service_unavailable_exception(message: str = "Service temporarily unavailable", retry_after: Optional[int] = 1):
+    """Return HTTPException for an unavailable service (retry_after None: retrying will not help)."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=message,
+        headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
+    )
@@ -1,39 +1,188 @@
+"""
+Application logging: a non-blocking pipeline.
+
+Loggers never touch a stream or file on the calling thread (the event
+loop). Records go through a bounded in-memory queue (QueueHandler); a
+QueueListener thread formats them and writes them to the console and to
+a rotating log file. When the queue is full records are dropped and
+counted, never waited for.
+
+    logger.info("Fetching patient with id=%s", patient_id)
+
+Pass values as arguments rather than f-strings: a disabled level then
+costs one level check, and message formatting happens in the listener
+thread. Arguments are formatted later, so pass values that are not
+mutated afterwards.
+
+LOG_FORMAT=json writes one JSON object per line (time, level, logger,
+message, extra fields, exception). LOG_SAMPLE_RATES keeps only a
+fraction of DEBUG/INFO records of chatty loggers, e.g.
+{"app.services.location": 0.1}; warnings and errors are always kept.
+"""
+
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
+from typing import Optional
 from app.core.config import settings
 
-# Create logs directory if not exists
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# LogRecord attributes that are not `extra=` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
 
-def setup_logging():
-    """Configure application logging."""
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
 
-    # Root logger
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL),
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            # Console handler
-            logging.StreamHandler(sys.stdout),
-            # File handler
-            logging.FileHandler(
-                logs_dir / "app.log",
-                encoding="utf-8"
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; `extra=` fields are included as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of DEBUG/INFO records per logger name prefix
+    (longest prefix wins); WARNING and above always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._rate_by_logger: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._rate_by_logger.get(name)
+        if rate is None:
+            prefix = max(
+                (prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")),
+                key=len,
+                default=None,
             )
-        ]
+            rate = self._rate_by_logger[name] = self.rates[prefix] if prefix is not None else 1.0
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that defers formatting to the listener and drops records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process: no need to pre-format for pickling, the listener formats
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def build_handlers() -> list[logging.Handler]:
+    """Console and rotating file handlers per settings (these do the actual I/O)."""
+    formatter = (
+        JSONFormatter() if settings.LOG_FORMAT == "json"
+        else logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
     )
+    handlers: list[logging.Handler] = []
+
+    if settings.LOG_CONSOLE:
+        handlers.append(logging.StreamHandler(sys.stdout))
+
+    if settings.LOG_FILE:
+        log_file = Path(settings.LOG_FILE)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        if settings.LOG_ROTATION == "time":
+            handlers.append(TimedRotatingFileHandler(
+                log_file, when=settings.LOG_ROTATION_WHEN,
+                backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8", delay=True,
+            ))
+        else:
+            handlers.append(RotatingFileHandler(
+                log_file, maxBytes=settings.LOG_MAX_BYTES,
+                backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8", delay=True,
+            ))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging():
+    """Configure application logging (root logger -> queue -> listener thread -> handlers)."""
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    if settings.LOG_SAMPLE_RATES:
+        _queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    _listener = QueueListener(_queue_handler.queue, *build_handlers(), respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(shutdown_logging)
+
+    # Root logger
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, settings.LOG_LEVEL))
+    root.handlers[:] = [_queue_handler]
 
     # Set third-party loggers to WARNING
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
 
 
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+
+    dropped = _queue_handler.dropped
+    _listener.stop()
+    for handler in _listener.handlers:
+        if dropped:
+            handler.handle(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": "%s log records dropped: queue was full", "args": (dropped,),
+            }))
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get logger instance for a module."""
     return logging.getLogger(name)
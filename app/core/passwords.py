@@ -0,0 +1,77 @@
+"""
+Password hashing (bcrypt via passlib) off the event loop.
+
+bcrypt is deliberately slow (tens of milliseconds per hash at the default
+cost). Running it inline in a coroutine would stall every other request
+of the worker, so hashing and verification run in a small thread pool
+(bcrypt releases the GIL). At most max_pending operations may be running
+or waiting at once; beyond that callers get a 503 right away instead of
+queueing without limit behind a burst of logins.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.core.exceptions import service_unavailable_exception
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int, max_workers: int, max_pending: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.max_pending = max_pending
+        self._pending = 0
+        # Verified against when the user does not exist, so response time does not reveal it;
+        # computed in the pool on first use
+        self._dummy_hash: Optional[str] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            raise service_unavailable_exception("Too many pending password checks")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash password with the configured cost."""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> tuple[bool, Optional[str]]:
+        """
+        Verify password against hash.
+
+        Returns:
+            Tuple of (is valid, new hash if the stored one should be replaced
+            because the configured cost changed)
+        """
+        if password_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self._run(self.context.hash, "dummy-password")
+            await self._run(self.context.verify, password, self._dummy_hash)
+            return False, None
+        return await self._run(self.context.verify_and_update, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from app.utils.serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used when brotli is not installed
+    brotli = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app: JSON rendered with
+    app.utils.serialization.dumps (orjson when installed).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """
+    JSON response for plain dicts/lists built from Core rows.
+
+    Returning it from an endpoint bypasses response_model validation, so
+    endpoints keep response_model only for the OpenAPI schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@dataclass(frozen=True)
+class PrecomputedJSON:
+    """
+    JSON body rendered and compressed once, served many times.
+
+    The ETag is derived from the content, so every worker produces the
+    same tag for the same data.
+    """
+    identity: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+
+    @classmethod
+    def build(cls, content: Any) -> "PrecomputedJSON":
+        body = dumps(content)
+        return cls(
+            identity=body,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            br=brotli.compress(body, quality=11) if brotli else None,
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+        )
+
+    def encodings(self) -> dict[str, bytes]:
+        """Available bodies by content coding, in order of preference."""
+        bodies = {"br": self.br, "gzip": self.gzip, "identity": self.identity}
+        return {coding: body for coding, body in bodies.items() if body is not None}
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str, available: list[str]) -> str:
+    """First coding of available (in preference order) that Accept-Encoding allows."""
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*")
+    for coding in available:
+        q = accepted.get(coding, wildcard if coding != "identity" else accepted.get("identity", 1.0))
+        if q:
+            return coding
+    return "identity"
+
+
+def precomputed_response(request: Request, body: PrecomputedJSON) -> Response:
+    """
+    Serve a PrecomputedJSON body.
+
+    Picks the best encoding from Accept-Encoding and answers a matching
+    If-None-Match with 304. Each encoding gets its own strong ETag.
+    """
+    encodings = body.encodings()
+    coding = choose_encoding(request.headers.get("accept-encoding", ""), list(encodings))
+    etags = {name: f'"{body.etag}"' if name == "identity" else f'"{body.etag}-{name}"' for name in encodings}
+
+    headers = {
+        "ETag": etags[coding],
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or tags & set(etags.values()):
+            return Response(status_code=304, headers=headers)
+
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=encodings[coding], media_type="application/json", headers=headers)
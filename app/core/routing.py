@@ -0,0 +1,76 @@
+"""
+Route class with a single-pass response path for Pydantic models.
+
+FastAPI handles a returned model in four passes: model_dump, validation
+against response_model, serialization to JSON-compatible data and JSON
+encoding. When an endpoint returns an instance of exactly its
+response_model (or a list of exactly the item model), the service has
+already validated it, so ModelResponseRoute serializes it straight to
+JSON bytes with the response model's TypeAdapter, built once per route
+at import time.
+
+Anything else (dicts, subclasses, Response objects) takes the regular
+FastAPI path. Routes using response_model_include/exclude/exclude_*
+options always take the regular path.
+"""
+
+import functools
+import inspect
+from typing import Any, Callable, Optional, get_args, get_origin
+from fastapi.responses import JSONResponse, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+
+def _exact_type_check(response_model: Any) -> Optional[Callable[[Any], bool]]:
+    """Predicate telling whether a result is exactly response_model (None: not supported)."""
+    if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+        return lambda result: type(result) is response_model
+
+    item_model = get_args(response_model)[0] if get_origin(response_model) is list else None
+    if isinstance(item_model, type) and issubclass(item_model, BaseModel):
+        return lambda result: type(result) is list and all(type(item) is item_model for item in result)
+
+    return None
+
+
+class ModelResponseRoute(APIRoute):
+    """APIRoute that renders already-validated response models in one pass."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+
+        is_exact = _exact_type_check(self.response_model)
+        response_class = (
+            self.response_class.value if isinstance(self.response_class, DefaultPlaceholder) else self.response_class
+        )
+        if (
+            is_exact is None
+            or not inspect.iscoroutinefunction(endpoint)
+            or not issubclass(response_class, JSONResponse)
+            or self.response_model_include is not None
+            or self.response_model_exclude is not None
+            or not self.response_model_by_alias
+            or self.response_model_exclude_unset
+            or self.response_model_exclude_defaults
+            or self.response_model_exclude_none
+        ):
+            return
+
+        adapter = TypeAdapter(self.response_model)
+        status_code = self.status_code or 200
+
+        @functools.wraps(endpoint)
+        async def call(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if is_exact(result):
+                return Response(
+                    content=adapter.dump_json(result, by_alias=True),
+                    status_code=status_code,
+                    media_type="application/json",
+                )
+            return result
+
+        # The request handler calls dependant.call; OpenAPI and parameters stay as declared
+        self.dependant.call = call
@@ -1,16 +1,28 @@
 """
 Security module for authentication/authorization.
-Basic HTTP authentication for admin endpoints.
-Prepared for JWT implementation in the future.
+Basic HTTP authentication for admin endpoints, JWT bearer authentication
+and role-based access control (RBAC) for staff endpoints.
 """
 
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
+from app.schemas.user import UserRole
+from app.services.session_revocation import revoked_sessions
+from app.utils.jwt import decode_access_token
+from app.utils.roles import ROLE_BITS, has_any_role, roles_to_mask
 
 # HTTP Basic Auth (simple version for admin)
 security = HTTPBasic()
 
+# Bearer token auth for staff (errors are raised by get_current_user)
+bearer_security = HTTPBearer(auto_error=False)
+
 
 def verify_admin_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> bool:
     """
@@ -30,6 +42,132 @@ def verify_admin_credentials(credentials: HTTPBasicCredentials = Depends(securit
     return True
 
 
-# TODO: Add JWT token generation and validation
-# TODO: Add password hashing utilities (bcrypt)
-# TODO: Add role-based access control (RBAC)
+@dataclass(frozen=True)
+class CurrentUser:
+    """Authenticated staff user, built from verified token claims (no DB access)."""
+    user_id: int
+    session_id: str
+    jshshir: str
+    full_name: str
+    roles: tuple[str, ...]
+    role_mask: int
+    expires_at: float
+
+    def has_any_role(self, required_mask: int) -> bool:
+        return has_any_role(self.role_mask, required_mask)
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified tokens, keyed by a hash of the token.
+
+    A hit skips signature verification and claim parsing; expiry is still
+    checked on every hit. Only valid tokens are cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, CurrentUser] = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[CurrentUser]:
+        user = self._entries.get(key)
+        if user is None:
+            return None
+        if user.expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+
+    def put(self, key: bytes, user: CurrentUser) -> None:
+        self._entries[key] = user
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def verify_token(token: str) -> Optional[CurrentUser]:
+    """Verify token signature and expiry and build CurrentUser (uncached)."""
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    try:
+        roles = tuple(payload.get("roles") or ())
+        role_mask = payload.get("role_mask")
+        return CurrentUser(
+            user_id=int(payload["user_id"]),
+            # Tokens without a session cannot be revoked and are rejected
+            session_id=str(payload["sid"]),
+            jshshir=payload["sub"],
+            full_name=payload.get("full_name", ""),
+            roles=roles,
+            # Tokens issued before role_mask existed only carry role names
+            role_mask=int(role_mask) if role_mask is not None else roles_to_mask(roles),
+            expires_at=float(payload["exp"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def authenticate_token(token: str) -> Optional[CurrentUser]:
+    """Verify token through the LRU cache, then check its session was not revoked."""
+    key = TokenCache.key(token)
+    user = token_cache.get(key)
+    if user is None:
+        user = verify_token(token)
+        if user is None:
+            return None
+        token_cache.put(key, user)
+    if revoked_sessions.is_revoked(user.session_id):
+        return None
+    return user
+
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_security)
+) -> CurrentUser:
+    """
+    Authenticate request by its Bearer JWT (signature, expiry, claims, session not revoked).
+    Raises 401 if the token is missing or invalid.
+    """
+    user = authenticate_token(credentials.credentials) if credentials else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def require_roles(*roles: UserRole):
+    """
+    Route dependency allowing only users with any of the given roles.
+
+    The required roles are folded into one bitmask up front, so the check
+    per request is a single AND.
+    """
+    required_mask = 0
+    for role in roles:
+        required_mask |= ROLE_BITS[role]
+
+    def check_roles(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if not user.has_any_role(required_mask):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+        return user
+
+    return check_roles
+
@@ -0,0 +1,252 @@
+"""
+Per-request SQL statistics and the slow-query log.
+
+SQLStatsMiddleware gives every HTTP request a RequestSQLStats object (in a
+context variable); cursor execute events of all engines add to it: number
+of statements, total DB time and the slowest statement. When the request
+ends its numbers are folded into per-route totals (GET /admin/db/queries)
+and sent back as a `Server-Timing: db` header.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged to the
+`app.db.slow_query` logger (sampled by SLOW_QUERY_SAMPLE_RATE) with a
+normalized fingerprint: literals and bind parameters replaced by `?`, so
+the same query with different values groups under one id.
+
+With N_PLUS_ONE_DETECTION on (staging), every statement of a request is
+counted by text; shapes executed N_PLUS_ONE_THRESHOLD times or more in
+one request are logged as N+1 suspects (typically a lazy-loaded
+relationship accessed in a loop).
+"""
+
+import hashlib
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+slow_query_logger = get_logger("app.db.slow_query")
+
+# conn.info key: start times of statements being executed on the connection
+QUERY_STARTED = "query_started"
+
+_NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # String literals
+    (re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+\b"), "?"),  # Bind parameters (pyformat, numeric, named)
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # Numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?+)"),  # IN lists / VALUES rows of any length
+    (re.compile(r"\s+"), " "),
+)
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """SQL text with literals and parameters replaced by `?` and whitespace collapsed."""
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Short stable id of a normalized statement."""
+    return hashlib.blake2b(normalize_statement(statement).encode(), digest_size=6).hexdigest()
+
+
+@dataclass
+class RequestSQLStats:
+    """SQL statistics of one request."""
+    queries: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    scope: dict = field(default_factory=dict, repr=False)
+    # Executions per statement text (only with N_PLUS_ONE_DETECTION)
+    statement_counts: Optional[Counter] = field(
+        default_factory=lambda: Counter() if settings.N_PLUS_ONE_DETECTION else None, repr=False
+    )
+
+    @property
+    def route(self) -> Optional[str]:
+        """Path template of the matched route (None before routing or if nothing matched)."""
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """(normalized statement, executions) of shapes run at least threshold times, most first."""
+        if not self.statement_counts:
+            return []
+        by_shape: Counter = Counter()
+        for statement, count in self.statement_counts.items():
+            by_shape[normalize_statement(statement)] += count
+        return [(shape, count) for shape, count in by_shape.most_common() if count >= threshold]
+
+
+_request_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def current_sql_stats() -> Optional[RequestSQLStats]:
+    """SQL statistics of the request being handled (None outside requests)."""
+    return _request_stats.get()
+
+
+def start_sql_stats() -> tuple[RequestSQLStats, Token]:
+    """Start collecting SQL statistics in the current context (outside requests, e.g. tests)."""
+    stats = RequestSQLStats()
+    return stats, _request_stats.set(stats)
+
+
+def stop_sql_stats(token: Token) -> None:
+    _request_stats.reset(token)
+
+
+@contextmanager
+def untracked_queries() -> Iterator[None]:
+    """
+    Do not attribute enclosed statements to the current request: for
+    shared cache fills that merely happen to run inside some request.
+    """
+    token = _request_stats.set(None)
+    try:
+        yield
+    finally:
+        _request_stats.reset(token)
+
+
+@dataclass
+class RouteSQLStats:
+    """SQL totals of one route (per worker)."""
+    requests: int = 0
+    queries: int = 0
+    total_ms: float = 0.0
+    max_queries: int = 0
+    slowest_ms: float = 0.0
+    slowest_fingerprint: Optional[str] = None
+    slowest_statement: Optional[str] = None
+
+
+class SQLStatsRegistry:
+    """Per-route SQL totals."""
+
+    def __init__(self):
+        self.routes: dict[str, RouteSQLStats] = {}
+
+    def record(self, route: str, stats: RequestSQLStats) -> None:
+        totals = self.routes.get(route)
+        if totals is None:
+            totals = self.routes[route] = RouteSQLStats()
+        totals.requests += 1
+        totals.queries += stats.queries
+        totals.total_ms += stats.total_ms
+        totals.max_queries = max(totals.max_queries, stats.queries)
+        if stats.slowest_ms > totals.slowest_ms:
+            totals.slowest_ms = stats.slowest_ms
+            totals.slowest_fingerprint = fingerprint(stats.slowest_statement)
+            totals.slowest_statement = normalize_statement(stats.slowest_statement)
+
+    def snapshot(self) -> list[dict]:
+        """Per-route totals, most DB time first (shaped like RouteQueryStats)."""
+        rows = []
+        for route, totals in self.routes.items():
+            rows.append({
+                "route": route,
+                "requests": totals.requests,
+                "queries": totals.queries,
+                "queries_per_request": totals.queries / totals.requests,
+                "max_queries": totals.max_queries,
+                "db_ms_total": totals.total_ms,
+                "db_ms_per_request": totals.total_ms / totals.requests,
+                "slowest_ms": totals.slowest_ms,
+                "slowest_fingerprint": totals.slowest_fingerprint,
+                "slowest_statement": totals.slowest_statement,
+            })
+        rows.sort(key=lambda row: row["db_ms_total"], reverse=True)
+        return rows
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+
+sql_stats = SQLStatsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(QUERY_STARTED, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info[QUERY_STARTED].pop()) * 1000
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.total_ms += elapsed_ms
+        if elapsed_ms > stats.slowest_ms:
+            stats.slowest_ms = elapsed_ms
+            stats.slowest_statement = statement
+        if stats.statement_counts is not None:
+            stats.statement_counts[statement] += 1
+
+    if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+        route = (stats.route or stats.scope.get("path")) if stats is not None else None
+        slow_query_logger.warning(
+            "Slow query %.1f ms [%s] route=%s: %s",
+            elapsed_ms, fingerprint(statement), route, normalize_statement(statement)
+        )
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(QUERY_STARTED):
+        connection.info[QUERY_STARTED].pop()
+
+
+def install_sql_instrumentation(engine: AsyncEngine) -> None:
+    """Time every statement executed through engine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+class SQLStatsMiddleware:
+    """Collects SQL statistics per HTTP request and adds a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats(scope=scope)
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Queries of a streaming body run after this point and are not included
+                timing = f'db;dur={stats.total_ms:.1f};desc="{stats.queries} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            if stats.queries and stats.route is not None:
+                sql_stats.record(f"{scope['method']} {stats.route}", stats)
+                for shape, count in stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD):
+                    logger.warning(
+                        "N+1 suspect: %s %s ran %sx [%s] %s",
+                        scope["method"], stats.route, count, fingerprint(shape), shape
+                    )
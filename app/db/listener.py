@@ -0,0 +1,106 @@
+"""
+PostgreSQL LISTEN/NOTIFY listener.
+
+Each worker process keeps one dedicated asyncpg connection (outside the
+SQLAlchemy pool) subscribed to the registered channels and dispatches
+notifications to async handlers. The connection is re-established
+automatically; reconnect hooks run afterwards so in-memory state can be
+resynchronized with anything missed while disconnected.
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+import asyncpg
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+NotificationHandler = Callable[[str], Awaitable[None]]
+ReconnectHook = Callable[[], Awaitable[None]]
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """Convert SQLAlchemy URL (postgresql+asyncpg://...) to plain asyncpg DSN."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class NotificationListener:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._handlers: dict[str, list[NotificationHandler]] = {}
+        self._reconnect_hooks: list[ReconnectHook] = []
+        self._task: asyncio.Task | None = None
+        self._connection: asyncpg.Connection | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    def add_handler(self, channel: str, handler: NotificationHandler) -> None:
+        """Register async handler called with the payload of each notification on channel."""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def add_reconnect_hook(self, hook: ReconnectHook) -> None:
+        """Register coroutine run after the connection is (re-)established, except the first time."""
+        self._reconnect_hooks.append(hook)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg-notification-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    def _dispatch(self, connection, pid, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            task = asyncio.create_task(self._call(handler, channel, payload))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _call(self, handler: NotificationHandler, channel: str, payload: str) -> None:
+        try:
+            await handler(payload)
+        except Exception:
+            logger.exception("Notification handler failed for channel %s", channel)
+
+    async def _run(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        first_connect = True
+        while True:
+            try:
+                closed = asyncio.Event()
+                self._connection = await asyncpg.connect(self.dsn)
+                self._connection.add_termination_listener(lambda _: closed.set())
+                for channel in self._handlers:
+                    await self._connection.add_listener(channel, self._dispatch)
+                logger.info("Listening for notifications on: %s", ", ".join(self._handlers))
+
+                if not first_connect:
+                    for hook in self._reconnect_hooks:
+                        await hook()
+                first_connect = False
+                delay = RECONNECT_DELAY_SECONDS
+
+                await closed.wait()
+                logger.warning("Notification listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification listener failed, retrying in %.0fs", delay)
+                first_connect = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+
+notification_listener = NotificationListener(asyncpg_dsn(settings.DATABASE_URL))
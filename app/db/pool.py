@@ -0,0 +1,133 @@
+"""
+Connection pool instrumentation and pre-ping strategies.
+
+Every engine gets its own QueuePool subclass carrying a PoolMetrics
+instance: checkout times go into a histogram (time spent waiting for a
+free connection, plus connecting when the pool grows), timeouts and
+pre-ping failures are counted. Gauges (checked out, overflow, idle) are
+read from the pool itself when stats are requested.
+
+Pre-ping strategies (DB_POOL_PRE_PING):
+    always  ping on every checkout (SQLAlchemy pool_pre_ping)
+    idle    ping only connections idle longer than DB_POOL_PRE_PING_IDLE_SECONDS
+    never   no ping; broken connections surface as errors of the first query
+"""
+
+import bisect
+import time
+from typing import Literal
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PrePingMode = Literal["always", "idle", "never"]
+
+# Checkout time histogram bucket upper bounds, milliseconds
+CHECKOUT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 30000)
+
+# connection_record.info key with the monotonic time of the last checkin
+CHECKED_IN_AT = "checked_in_at"
+
+
+class PoolMetrics:
+    """Counters and checkout time histogram of one pool (per worker)."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)  # Last bucket: above all bounds
+        self.checkouts = 0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.max_checked_out = 0
+
+    def observe_checkout(self, elapsed_ms: float, checked_out: int) -> None:
+        self.bucket_counts[bisect.bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)] += 1
+        self.checkouts += 1
+        self.checkout_ms_total += elapsed_ms
+        self.checkout_ms_max = max(self.checkout_ms_max, elapsed_ms)
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+
+    def histogram(self) -> list[dict]:
+        """Cumulative buckets ({"le": bound in ms or None for +Inf, "count": n})."""
+        buckets, total = [], 0
+        for bound, count in zip((*CHECKOUT_BUCKETS_MS, None), self.bucket_counts):
+            total += count
+            buckets.append({"le": bound, "count": total})
+        return buckets
+
+
+class TimedPoolMixin:
+    """Times QueuePool checkouts into self.metrics."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe_checkout((time.perf_counter() - started) * 1000, self.checkedout())
+        return record
+
+
+def timed_pool_class(metrics: PoolMetrics, base: type[QueuePool] = AsyncAdaptedQueuePool) -> type[QueuePool]:
+    """Pool class bound to metrics (the pool recreates itself from its class on dispose)."""
+    return type(f"Timed{base.__name__}", (TimedPoolMixin, base), {"metrics": metrics})
+
+
+def install_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Ping connections on checkout only if they sat idle in the pool longer than idle_seconds.
+
+    Busy pools skip the extra round trip; connections that may have been
+    dropped by the server or a proxy while idle are still checked. A failed
+    ping makes the pool discard the connection and check out another one.
+    """
+    sync_engine = engine.sync_engine
+    metrics = sync_engine.pool.metrics
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info[CHECKED_IN_AT] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get(CHECKED_IN_AT)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics.pings += 1
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            metrics.ping_failures += 1
+            logger.warning("Pre-ping of idle connection failed, reconnecting: %s", e)
+            raise exc.DisconnectionError() from e
+
+
+def pool_stats(name: str, engine: AsyncEngine) -> dict:
+    """Current gauges and metrics of engine's pool (shaped like PoolStats)."""
+    pool = engine.sync_engine.pool
+    metrics: PoolMetrics = pool.metrics
+    return {
+        "name": name,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_checked_out": metrics.max_checked_out,
+        "checkouts": metrics.checkouts,
+        "checkout_ms_avg": metrics.checkout_ms_total / metrics.checkouts if metrics.checkouts else 0.0,
+        "checkout_ms_max": metrics.checkout_ms_max,
+        "checkout_ms_histogram": metrics.histogram(),
+        "timeouts": metrics.timeouts,
+        "pre_pings": metrics.pings,
+        "pre_ping_failures": metrics.ping_failures,
+    }
@@ -0,0 +1,120 @@
+"""
+Statement budgets: fail (or log) when a code path runs more SQL statements than declared.
+
+    # In a test: raises QueryBudgetExceeded on the 3rd statement's path
+    async with query_budget(2):
+        await service.get_patient_by_id(patient_id)
+
+    # On an endpoint: checked on every request, outcome per QUERY_BUDGET_MODE
+    @router.get("/{patient_id}")
+    @endpoint_budget(2)
+    async def get_patient(...): ...
+
+Both work as sync/async context managers and as decorators. Statements
+are counted by the SQL instrumentation (app/db/instrumentation.py), so
+lazy loads, flushes and savepoints all count. Budgets nest: each counts
+only the statements run inside it.
+"""
+
+import functools
+import inspect
+from typing import Optional
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.instrumentation import current_sql_stats, start_sql_stats, stop_sql_stats
+
+logger = get_logger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Code path ran more SQL statements than its budget allows."""
+
+
+class query_budget:
+    """
+    Allow at most max_queries statements inside the block / decorated function.
+
+    Args:
+        max_queries: Statement budget
+        label: Name used in the error (default: decorated function name)
+        mode: "raise", "log" or "off"; None follows QUERY_BUDGET_MODE
+    """
+
+    def __init__(self, max_queries: int, label: Optional[str] = None, mode: Optional[str] = "raise"):
+        self.max_queries = max_queries
+        self.label = label
+        self.mode = mode
+        self._stats = None
+        self._token = None
+        self._start = 0
+
+    def _enter(self) -> "query_budget":
+        stats = current_sql_stats()
+        if stats is None:
+            stats, self._token = start_sql_stats()
+        self._stats = stats
+        self._start = stats.queries
+        return self
+
+    def _exit(self, failed: bool) -> None:
+        used = self._stats.queries - self._start
+        if self._token is not None:
+            stop_sql_stats(self._token)
+            self._token = None
+        # An exception from the code path itself takes precedence
+        if failed or used <= self.max_queries:
+            return
+
+        mode = self.mode or settings.QUERY_BUDGET_MODE
+        if mode == "off":
+            return
+        message = f"Query budget exceeded: {self.label or 'block'} ran {used} statements, budget {self.max_queries}"
+        repeated = self._stats.repeated_statements(2)
+        if repeated:
+            message += "; repeated: " + "; ".join(f"{count}x {shape}" for shape, count in repeated[:3])
+        if mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    @property
+    def used(self) -> int:
+        """Statements run so far inside the block."""
+        return self._stats.queries - self._start if self._stats is not None else 0
+
+    def __enter__(self):
+        return self._enter()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._exit(exc_type is not None)
+        return False
+
+    async def __aenter__(self):
+        return self._enter()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._exit(exc_type is not None)
+        return False
+
+    def __call__(self, func):
+        label = self.label or func.__qualname__
+
+        def budget():
+            return type(self)(self.max_queries, label, self.mode)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with budget():
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with budget():
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def endpoint_budget(max_queries: int, label: Optional[str] = None) -> query_budget:
+    """Declared budget of an endpoint or production code path (outcome per QUERY_BUDGET_MODE)."""
+    return query_budget(max_queries, label, mode=None)
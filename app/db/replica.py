@@ -0,0 +1,142 @@
+"""
+Routing of read-only requests to a streaming read replica.
+
+Read endpoints take their session from get_read_db (app/db/session.py),
+which asks replica_router for a session factory:
+
+    - no replica configured, or replica lagging / unreachable -> primary
+    - client wrote recently (sticky cookie, see StickyPrimaryMiddleware) -> primary
+    - otherwise -> replica
+
+Replica lag is measured by a background task every
+REPLICA_LAG_CHECK_INTERVAL seconds rather than per request.
+"""
+
+import asyncio
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Cookie holding the Unix time until which the client reads from the primary
+STICKY_COOKIE = "dmed_primary_until"
+
+# Seconds the replica is behind the primary (0 when it has replayed everything it received)
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """Chooses primary or replica session factory for read-only requests."""
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: Optional[async_sessionmaker],
+        replica_engine: Optional[AsyncEngine],
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.replica_engine = replica_engine
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def session_factory(self, request: Request) -> async_sessionmaker:
+        if self.replica is None or not self.healthy:
+            return self.primary
+        sticky_until = request.cookies.get(STICKY_COOKIE)
+        if sticky_until is not None:
+            try:
+                if float(sticky_until) > time.time():
+                    return self.primary
+            except ValueError:
+                pass
+        return self.replica
+
+    async def check_lag(self) -> None:
+        """Measure replica lag and update health."""
+        try:
+            async with self.replica_engine.connect() as connection:
+                lag = float(await connection.scalar(REPLICA_LAG_QUERY))
+        except Exception as e:
+            if self.healthy or self.checked_at is None:
+                logger.warning("Read replica unreachable, reading from primary: %s", e)
+            self.healthy, self.lag_seconds = False, None
+        else:
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if healthy != self.healthy:
+                if healthy:
+                    logger.info("Read replica in use (lag %.2fs)", lag)
+                else:
+                    logger.warning("Read replica lag %.2fs, reading from primary", lag)
+            self.healthy, self.lag_seconds = healthy, lag
+        self.checked_at = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_INTERVAL)
+
+    async def start(self) -> None:
+        if self.replica is not None and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="replica-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        """Replica routing state (shaped like ReplicaStatus)."""
+        return {
+            "configured": self.replica is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "checked_at": self.checked_at,
+        }
+
+
+class StickyPrimaryMiddleware:
+    """
+    Read-your-writes: after a successful write request, set a short-lived
+    cookie that makes the client's reads go to the primary until the
+    replica has (very likely) caught up.
+    """
+
+    WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(self, app, sticky_seconds: int):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{STICKY_COOKIE}={time.time() + self.sticky_seconds:.3f}; "
+                    f"Max-Age={self.sticky_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
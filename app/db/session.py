@@ -1,13 +1,49 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from fastapi import Request
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import install_sql_instrumentation
+from app.db.pool import PoolMetrics, timed_pool_class, install_idle_pre_ping
+from app.db.replica import ReplicaRouter
+from app.db.unit_of_work import commit, rollback
+
+
+def build_engine(url: str, **pool_options) -> AsyncEngine:
+    """
+    Create async engine with an instrumented pool (see app/db/pool.py) and
+    per-request SQL statistics (see app/db/instrumentation.py).
+
+    Pool sizing and pre-ping strategy come from settings; pool_options
+    (pool_size, max_overflow, pool_timeout, pool_recycle, pre_ping) override them.
+    """
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    options.update(pool_options)
+    pre_ping = options.pop("pre_ping")
+
+    async_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=timed_pool_class(PoolMetrics()),
+        pool_pre_ping=pre_ping == "always",
+        **options,
+    )
+    if pre_ping == "idle":
+        install_idle_pre_ping(async_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    install_sql_instrumentation(async_engine)
+    return async_engine
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-)
+engine = build_engine(settings.DATABASE_URL)
+
+# Read replica engine (None when DATABASE_REPLICA_URL is not set)
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -18,10 +54,37 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+) if replica_engine is not None else None
+
+replica_router = ReplicaRouter(AsyncSessionLocal, ReplicaSessionLocal, replica_engine)
+
 
 async def get_db() -> AsyncSession:
-    """Dependency for getting async database session."""
+    """
+    Dependency for getting async database session (unit of work, see app/db/unit_of_work.py).
+
+    Commits once after the endpoint returned, before the response is sent;
+    rolls back if it raised.
+    """
     async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            if session.in_transaction():
+                await commit(session)
+        except BaseException:
+            await rollback(session)
+            raise
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Dependency for read-only endpoints: replica session when it is safe, else primary."""
+    async with replica_router.session_factory(request)() as session:
         try:
             yield session
         finally:
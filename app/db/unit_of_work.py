@@ -0,0 +1,62 @@
+"""
+Unit of work on top of AsyncSession.
+
+Repositories only add/execute/flush; the transaction is committed once at
+the request boundary by get_db (app/db/session.py), or rolled back if the
+request failed. Work that must happen only once the data is visible to
+others (reloading in-memory caches, publishing revocations) is registered
+with after_commit and runs right after that commit; it is dropped on
+rollback.
+
+Savepoints are opt-in: wrap a step in `async with savepoint(db):` when
+its failure should be recoverable without abandoning the whole request.
+"""
+
+import inspect
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Plain function or coroutine function
+AfterCommitHook = Callable[[], Optional[Awaitable[None]]]
+
+# session.info key holding pending after-commit hooks
+AFTER_COMMIT_HOOKS = "after_commit_hooks"
+
+
+def after_commit(db: AsyncSession, hook: AfterCommitHook) -> None:
+    """Run hook after the current transaction of db commits (discarded on rollback)."""
+    db.info.setdefault(AFTER_COMMIT_HOOKS, []).append(hook)
+
+
+async def commit(db: AsyncSession) -> None:
+    """Commit db and run its after-commit hooks."""
+    await db.commit()
+    hooks = db.info.pop(AFTER_COMMIT_HOOKS, [])
+    for hook in hooks:
+        try:
+            result = hook()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            # Data is committed; a failed hook must not turn the request into an error
+            logger.exception("After-commit hook failed")
+
+
+async def rollback(db: AsyncSession) -> None:
+    """Roll back db and drop its after-commit hooks."""
+    db.info.pop(AFTER_COMMIT_HOOKS, None)
+    await db.rollback()
+
+
+@asynccontextmanager
+async def savepoint(db: AsyncSession) -> AsyncIterator[None]:
+    """
+    Run enclosed work in a SAVEPOINT: if it raises, only that work is
+    rolled back and the exception propagates; the outer transaction stays usable.
+    """
+    async with db.begin_nested():
+        yield
@@ -2,8 +2,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
 from app.core.logging import setup_logging, get_logger
+from app.core.responses import FastJSONResponse
 from app.api.v1.router import api_router
+from app.core.passwords import password_hasher
+from app.db.listener import notification_listener
+from app.db.instrumentation import SQLStatsMiddleware
+from app.db.replica import StickyPrimaryMiddleware
+from app.db.session import replica_router
+from app.repositories.region import CATALOG_CHANNEL
+from app.repositories.session import SESSION_REVOKED_CHANNEL
+from app.services.location_catalog import location_catalog
+from app.services.session_revocation import revoked_sessions
 
 # Setup logging
 setup_logging()
@@ -14,10 +25,36 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+
+    # Location catalog: load once, reload whenever an import publishes a new version
+    try:
+        await location_catalog.reload()
+    except Exception:
+        logger.exception("Failed to load location catalog, it will be loaded on first use")
+    notification_listener.add_handler(CATALOG_CHANNEL, location_catalog.handle_notification)
+    # Notifications may be missed while disconnected
+    notification_listener.add_reconnect_hook(location_catalog.reload)
+
+    # Revoked sessions: load recent revocations, then follow the channel
+    try:
+        await revoked_sessions.reload()
+    except Exception:
+        logger.exception("Failed to load session revocations")
+    notification_listener.add_handler(SESSION_REVOKED_CHANNEL, revoked_sessions.handle_notification)
+    notification_listener.add_reconnect_hook(revoked_sessions.reload)
+
+    await notification_listener.start()
+
+    # Read replica lag monitor (no-op without DATABASE_REPLICA_URL)
+    await replica_router.start()
+
     logger.info("Application startup complete")
     yield
     # Shutdown
+    await replica_router.stop()
+    await notification_listener.stop()
+    password_hasher.shutdown()
     logger.info("Application shutdown")
 
 
@@ -26,6 +63,7 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -39,6 +77,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read-your-writes for replica routing: clients that just wrote read from the primary
+if settings.DATABASE_REPLICA_URL:
+    app.add_middleware(StickyPrimaryMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS)
+
+# Per-request SQL statistics (Server-Timing header, GET /admin/db/queries)
+app.add_middleware(SQLStatsMiddleware)
+
+# gzip/br for clients that accept it (outermost: compresses what all other layers produced)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 # Include API router
 app.include_router(api_router)
 
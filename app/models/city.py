@@ -1,14 +1,19 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 
 class City(Base):
     __tablename__ = "cities"
+    __table_args__ = (
+        UniqueConstraint("region_id", "name", name="uq_cities_region_id_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False, index=True)
     region_id = Column(Integer, ForeignKey("regions.id", ondelete="CASCADE"), nullable=False)
+    # Location catalog version in which the row was added
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # Relationships
     region = relationship("Region", back_populates="cities")
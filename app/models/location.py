@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Index, UniqueConstraint
+from app.db.base import Base
+
+# Hierarchy levels, top to bottom
+LOCATION_LEVELS = ("region", "district", "mahalla")
+
+
+class Location(Base):
+    """
+    Node of the location hierarchy (region -> district -> mahalla).
+
+    Region and district nodes mirror rows of `regions` and `cities`
+    (linked through region_id / city_id); deeper levels exist only here.
+    """
+    __tablename__ = "locations"
+    __table_args__ = (
+        UniqueConstraint("parent_id", "name", name="uq_locations_parent_id_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=True)
+    level = Column(String(20), nullable=False)
+    name = Column(String(255), nullable=False)
+
+    # Legacy rows this node mirrors
+    region_id = Column(Integer, ForeignKey("regions.id", ondelete="CASCADE"), nullable=True, unique=True)
+    city_id = Column(Integer, ForeignKey("cities.id", ondelete="CASCADE"), nullable=True, unique=True)
+
+    # Location catalog version in which the row was added
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<Location(id={self.id}, level={self.level}, name={self.name})>"
+
+
+class LocationClosure(Base):
+    """
+    Closure table of the location hierarchy: one row per (ancestor, descendant)
+    pair including every node with itself at depth 0, so "all descendants of X"
+    is a single primary key range scan.
+    """
+    __tablename__ = "location_closure"
+    __table_args__ = (
+        Index("ix_location_closure_descendant_id", "descendant_id"),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<LocationClosure(ancestor_id={self.ancestor_id}, descendant_id={self.descendant_id}, depth={self.depth})>"
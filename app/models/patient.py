@@ -1,6 +1,5 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, Index, func, literal_column
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from app.db.base import Base
 
 
@@ -18,6 +17,8 @@ class Patient(Base):
     # Location
     region_id = Column(Integer, ForeignKey("regions.id", ondelete="SET NULL"), nullable=True)
     city_id = Column(Integer, ForeignKey("cities.id", ondelete="SET NULL"), nullable=True)
+    # Most specific node of the location hierarchy (region, district or mahalla)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="SET NULL"), nullable=True, index=True)
     address = Column(String(500), nullable=True)
 
     # Timestamps
@@ -29,5 +30,44 @@ class Patient(Base):
     city = relationship("City", back_populates="patients")
     medical_card = relationship("MedicalCard", back_populates="patient", uselist=False, cascade="all, delete-orphan")
 
+    # Server-generated columns (updated_at) come back with the flush (RETURNING),
+    # so repositories need no refresh() round trip
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination order: (last_name, first_name, id)
+        Index("ix_patients_name_keyset", "last_name", "first_name", "id"),
+        # Trigram indexes for ILIKE '%x%' search
+        Index(
+            "ix_patients_first_name_trgm", "first_name",
+            postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_patients_last_name_trgm", "last_name",
+            postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_patients_middle_name_trgm", "middle_name",
+            postgresql_using="gin", postgresql_ops={"middle_name": "gin_trgm_ops"}
+        ),
+    )
+
     def __repr__(self):
         return f"<Patient(id={self.id}, first_name={self.first_name}, last_name={self.last_name})>"
+
+
+# "last_name first_name middle_name" expression used by fuzzy search.
+# Must stay identical to the ix_patients_full_name_trgm index expression.
+PATIENT_FULL_NAME = (
+    Patient.last_name
+    + literal_column("' '")
+    + Patient.first_name
+    + literal_column("' '")
+    + func.coalesce(Patient.middle_name, literal_column("''"))
+)
+
+Index(
+    "ix_patients_full_name_trgm",
+    PATIENT_FULL_NAME.label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, BigInteger, String
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -8,6 +8,8 @@ class Region(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False, unique=True, index=True)
+    # Location catalog version in which the row was added
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # Relationships
     cities = relationship("City", back_populates="region", cascade="all, delete-orphan")
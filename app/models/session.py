@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class UserSession(Base):
+    """
+    Login session of a staff user.
+
+    Access tokens carry the session id (`sid` claim); the refresh token is
+    stored only as a SHA-256 hash and rotated on every refresh. Revoked rows
+    are kept until they expire so workers can rebuild their revocation set.
+    """
+    __tablename__ = "user_sessions"
+    __mapper_args__ = {"eager_defaults": True}  # Timestamps returned by the flush
+    __table_args__ = (
+        # Revocations still able to matter (loaded by every worker on startup)
+        Index("ix_user_sessions_revoked_at", "revoked_at", postgresql_where=text("revoked_at IS NOT NULL")),
+    )
+
+    id = Column(String(32), primary_key=True)  # Random hex, `sid` claim of access tokens
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    refresh_token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Refresh token expiry
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<UserSession(id={self.id}, user_id={self.user_id}, revoked_at={self.revoked_at})>"
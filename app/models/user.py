@@ -1,6 +1,15 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ARRAY
+from sqlalchemy import Column, Integer, String, Date, DateTime, ARRAY, Index, literal_column
 from sqlalchemy.sql import func
 from app.db.base import Base
+from app.utils.roles import ROLE_BITS
+
+
+def role_filter(bit: int):
+    """
+    `(role_mask & bit) <> 0` with the bit inlined, so the planner can match
+    the per-role partial index (a bind parameter would not match it).
+    """
+    return literal_column(f"(role_mask & {int(bit)}) <> 0")
 
 
 class User(Base):
@@ -10,7 +19,9 @@ class User(Base):
     full_name = Column(String(255), nullable=False, index=True)
     jshshir = Column(String(14), nullable=False, unique=True, index=True)  # Passport 14-digit number
     password = Column(String(6), nullable=False)  # 6-digit password (plain text)
+    password_hash = Column(String(255), nullable=True)  # bcrypt hash, set on first login
     roles = Column(ARRAY(String), nullable=False)  # List of roles
+    role_mask = Column(Integer, nullable=False, default=0, server_default="0")  # Bits from app/utils/roles.py
     gender = Column(String(10), nullable=False)  # male, female
     birth_date = Column(Date, nullable=False)
     phone = Column(String(20), nullable=True)
@@ -19,5 +30,19 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __mapper_args__ = {"eager_defaults": True}  # Timestamps returned by the flush
+    __table_args__ = (
+        # Keyset pagination order: (full_name, id)
+        Index("ix_users_name_keyset", "full_name", "id"),
+        # One partial index per role, in keyset order; used by role_filter()
+        *(
+            Index(
+                f"ix_users_role_{role.value}", "full_name", "id",
+                postgresql_where=role_filter(bit),
+            )
+            for role, bit in ROLE_BITS.items()
+        ),
+    )
+
     def __repr__(self):
         return f"<User(id={self.id}, full_name={self.full_name}, jshshir={self.jshshir}, roles={self.roles})>"
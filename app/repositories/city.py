@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, literal, tuple_, BigInteger, String, RowMapping
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from typing import Optional
 from app.models.city import City
+from app.models.region import Region
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -23,18 +25,71 @@ class CityRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_by_region_id(self, region_id: int) -> list[City]:
-        """Get all cities in a region."""
+    async def get_all_rows(self) -> list[RowMapping]:
+        """Get all cities as rows (no ORM instances)."""
         result = await self.db.execute(
-            select(City).where(City.region_id == region_id)
+            select(City.name, City.region_id, City.id, City.version)
+            .order_by(City.region_id, City.id)
         )
-        return list(result.scalars().all())
+        return list(result.mappings().all())
+
+    def _source_pairs(self, region_names: list[str], city_names: list[str]):
+        """(region, city, ord) rows of parallel name arrays."""
+        return func.unnest(
+            literal(region_names, ARRAY(String)),
+            literal(city_names, ARRAY(String)),
+        ).table_valued("region", "city", with_ordinality="ord").render_derived("source")
+
+    async def insert_missing(
+        self,
+        region_names: list[str],
+        city_names: list[str],
+        version: int
+    ) -> list[RowMapping]:
+        """
+        Insert cities missing from their regions, in the given order.
+
+        Args:
+            region_names: Region name of each city (regions must already exist)
+            city_names: City names, parallel to region_names
+            version: Catalog version stamped on inserted rows
+
+        Returns:
+            Inserted rows (name, region_id, id)
+        """
+        source = self._source_pairs(region_names, city_names)
+        result = await self.db.execute(
+            insert(City)
+            .from_select(
+                ["name", "region_id", "version"],
+                select(source.c.city, Region.id, literal(version, BigInteger))
+                .join(Region, Region.name == source.c.region)
+                .order_by(source.c.ord)
+            )
+            .on_conflict_do_nothing(index_elements=[City.region_id, City.name])
+            .returning(City.name, City.region_id, City.id)
+        )
+        return list(result.mappings().all())
+
+    async def get_missing_from(self, region_names: list[str], city_names: list[str]) -> list[RowMapping]:
+        """Get cities (name, region_id, id) whose (region name, city name) pair is not in the given lists."""
+        source = self._source_pairs(region_names, city_names)
+        result = await self.db.execute(
+            select(City.name, City.region_id, City.id)
+            .join(Region, Region.id == City.region_id)
+            .where(
+                tuple_(Region.name, City.name).not_in(
+                    select(source.c.region, source.c.city)
+                )
+            )
+            .order_by(City.region_id, City.id)
+        )
+        return list(result.mappings().all())
 
     async def create(self, name: str, region_id: int) -> City:
         """Create new city."""
         city = City(name=name, region_id=region_id)
         self.db.add(city)
-        await self.db.commit()
-        await self.db.refresh(city)
-        logger.info(f"Created city: {city.name} (id={city.id}, region_id={city.region_id})")
+        await self.db.flush()
+        logger.info("Created city: %s (id=%s, region_id=%s)", city.name, city.id, city.region_id)
         return city
@@ -0,0 +1,128 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, exists, literal, null, union_all, BigInteger, Integer, String, RowMapping
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from typing import Optional
+from app.models.location import Location, LocationClosure
+from app.models.region import Region
+from app.models.city import City
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LocationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_rows(self) -> list[RowMapping]:
+        """Get all location nodes as rows (no ORM instances)."""
+        result = await self.db.execute(
+            select(
+                Location.id,
+                Location.parent_id,
+                Location.level,
+                Location.name,
+                Location.region_id,
+                Location.city_id,
+                Location.version,
+            ).order_by(Location.id)
+        )
+        return list(result.mappings().all())
+
+    async def create(self, parent_id: int, level: str, name: str, version: int) -> Optional[RowMapping]:
+        """
+        Create location node and its closure rows in one statement.
+
+        Closure rows are the parent's ancestor rows shifted one level down
+        plus the node itself at depth 0.
+
+        Returns:
+            Created row (id, parent_id, level, name), None if the parent
+            already has a child with this name
+        """
+        node = (
+            insert(Location)
+            .values(parent_id=parent_id, level=level, name=name, version=version)
+            .on_conflict_do_nothing(index_elements=[Location.parent_id, Location.name])
+            .returning(Location.id, Location.parent_id, Location.level, Location.name)
+            .cte("node")
+        )
+        closure_rows = union_all(
+            select(LocationClosure.ancestor_id, node.c.id, LocationClosure.depth + 1)
+            .where(LocationClosure.descendant_id == parent_id),
+            select(node.c.id, node.c.id, literal(0, Integer)),
+        )
+        closure = (
+            insert(LocationClosure)
+            .from_select(["ancestor_id", "descendant_id", "depth"], closure_rows)
+            .cte("closure")
+        )
+        result = await self.db.execute(
+            select(node).add_cte(closure)
+        )
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        logger.info("Created location: %s (%s, id=%s, parent_id=%s)", row["name"], row["level"], row["id"], parent_id)
+        return row
+
+    async def insert_missing_legacy_nodes(self, version: int) -> int:
+        """
+        Mirror regions and cities that have no location node yet.
+
+        Regions become root "region" nodes, cities become "district" nodes
+        under their region's node; closure rows are added for the new nodes.
+
+        Returns:
+            Number of created nodes
+        """
+        region_nodes = await self.db.execute(
+            insert(Location).from_select(
+                ["parent_id", "level", "name", "region_id", "version"],
+                select(
+                    null(), literal("region", String), Region.name, Region.id, literal(version, BigInteger)
+                )
+                .where(~exists().where(Location.region_id == Region.id))
+                .order_by(Region.id)
+            )
+        )
+        region_node = aliased(Location)
+        district_nodes = await self.db.execute(
+            insert(Location).from_select(
+                ["parent_id", "level", "name", "city_id", "version"],
+                select(
+                    region_node.id, literal("district", String), City.name, City.id, literal(version, BigInteger)
+                )
+                .join(region_node, region_node.region_id == City.region_id)
+                .where(~exists().where(Location.city_id == City.id))
+                .order_by(City.id)
+            )
+        )
+        created = region_nodes.rowcount + district_nodes.rowcount
+        if created:
+            await self._insert_closure_rows(version)
+        return created
+
+    async def _insert_closure_rows(self, version: int) -> None:
+        """
+        Add closure rows for nodes created in this version.
+
+        Self rows go first; then every new node copies its parent's rows.
+        New nodes here are only regions (roots) and districts, so a parent's
+        rows are complete once the self rows exist.
+        """
+        await self.db.execute(
+            insert(LocationClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(Location.id, Location.id, literal(0, Integer)).where(Location.version == version)
+            )
+        )
+        await self.db.execute(
+            insert(LocationClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(LocationClosure.ancestor_id, Location.id, LocationClosure.depth + 1)
+                .join(LocationClosure, LocationClosure.descendant_id == Location.parent_id)
+                .where(Location.version == version)
+            )
+        )
@@ -1,30 +1,99 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import Float, Select, RowMapping, select, or_, and_, func, literal, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-from typing import Optional
-from app.models.patient import Patient
+from sqlalchemy.sql.elements import ColumnElement, Grouping
+from typing import AsyncIterator, Optional
+from app.models.patient import Patient, PATIENT_FULL_NAME
 from app.models.medical_card import MedicalCard
+from app.models.location import LocationClosure
 from app.schemas.patient import PatientCreate, PatientUpdate
+from app.utils.pagination import Cursor, DIRECTION_PREV, keyset_condition
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Keyset sort orders for patient lists (every key must be NOT NULL)
+PATIENT_SORT_KEYS = {
+    "name": (Patient.last_name, Patient.first_name, Patient.id),
+    "id": (Patient.id,),
+}
+
+# Columns selected for patient list pages (PatientListResponse + card)
+LIST_COLUMNS = (
+    Patient.id,
+    Patient.first_name,
+    Patient.last_name,
+    Patient.middle_name,
+    Patient.birth_date,
+    Patient.gender,
+    Patient.phone,
+    MedicalCard.id.label("card_id"),
+    MedicalCard.card_number,
+    MedicalCard.created_at.label("card_created_at"),
+)
+
+# Columns written by patient export, in output order
+EXPORT_COLUMNS = (
+    Patient.id,
+    Patient.last_name,
+    Patient.first_name,
+    Patient.middle_name,
+    Patient.birth_date,
+    Patient.gender,
+    Patient.phone,
+    Patient.region_id,
+    Patient.city_id,
+    Patient.location_id,
+    Patient.address,
+    MedicalCard.card_number,
+    Patient.created_at,
+)
+
+# Sort order used by fuzzy search: (similarity rank DESC, id ASC)
+SORT_RANK = "rank"
+
+# Upper bound on tokens taken from a fuzzy search query
+MAX_SEARCH_TOKENS = 5
+
+
+def search_tokens(search: str) -> list[str]:
+    """Split fuzzy search query into tokens ("Karimov Aziz" -> ["Karimov", "Aziz"])."""
+    return search.split()[:MAX_SEARCH_TOKENS]
+
+
+def search_rank(tokens: list[str]) -> ColumnElement:
+    """Similarity rank of patient full name against all search tokens."""
+    rank = None
+    for token in tokens:
+        similarity = func.word_similarity(literal(token), PATIENT_FULL_NAME, type_=Float)
+        rank = similarity if rank is None else rank + similarity
+    return rank
+
 
 class PatientRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_all(
-        self,
+    @staticmethod
+    def _apply_filters(
+        query: Select,
         search: Optional[str] = None,
         region_id: Optional[int] = None,
-        city_id: Optional[int] = None
-    ) -> list[Patient]:
-        """Get all patients with optional filters."""
-        query = select(Patient).options(selectinload(Patient.medical_card))
-
-        # Apply filters
-        if search:
+        city_id: Optional[int] = None,
+        medical_card_number: Optional[str] = None,
+        fuzzy: bool = False,
+        location_id: Optional[int] = None
+    ) -> Select:
+        """Apply common list filters to patient query (medical_cards must be joined)."""
+        if search and fuzzy:
+            # `token <% full_name` is served by the ix_patients_full_name_trgm GIN index;
+            # every token has to match some word of the full name
+            query = query.where(and_(*(
+                literal(token).op("<%")(Grouping(PATIENT_FULL_NAME)) for token in search_tokens(search)
+            )))
+        elif search:
+            # ILIKE '%x%' is served by the per-column gin_trgm_ops indexes
             search_filter = or_(
                 Patient.first_name.ilike(f"%{search}%"),
                 Patient.last_name.ilike(f"%{search}%"),
@@ -38,8 +107,118 @@ class PatientRepository:
         if city_id:
             query = query.where(Patient.city_id == city_id)
 
+        if medical_card_number:
+            query = query.where(MedicalCard.card_number == medical_card_number)
+
+        if location_id:
+            # Node and every level below it: closure PK range scan, semi-joined on ix_patients_location_id
+            query = query.where(Patient.location_id.in_(
+                select(LocationClosure.descendant_id).where(LocationClosure.ancestor_id == location_id)
+            ))
+
+        return query
+
+    @staticmethod
+    def _list_query(*columns) -> Select:
+        """Column query over patients with the medical card joined in the same statement."""
+        return (
+            select(*columns)
+            .select_from(Patient)
+            .outerjoin(MedicalCard, MedicalCard.patient_id == Patient.id)
+        )
+
+    @staticmethod
+    def sort_keys(sort: str, search: Optional[str] = None) -> tuple[tuple, tuple]:
+        """Return (key expressions, descending flags) for a keyset sort order."""
+        if sort == SORT_RANK:
+            return (search_rank(search_tokens(search)), Patient.id), (True, False)
+        keys = PATIENT_SORT_KEYS[sort]
+        return keys, (False,) * len(keys)
+
+    async def set_similarity_threshold(self, threshold: float) -> None:
+        """Set pg_trgm word similarity threshold for the current transaction."""
+        await self.db.execute(
+            select(func.set_config(
+                literal_column("'pg_trgm.word_similarity_threshold'"), str(threshold), True
+            ))
+        )
+
+    async def get_page(
+        self,
+        limit: int,
+        sort: str = "name",
+        cursor: Optional[Cursor] = None,
+        search: Optional[str] = None,
+        region_id: Optional[int] = None,
+        city_id: Optional[int] = None,
+        medical_card_number: Optional[str] = None,
+        location_id: Optional[int] = None
+    ) -> tuple[list, bool]:
+        """
+        Get one keyset page of patient list rows.
+
+        Selects only LIST_COLUMNS with the card joined in one statement and
+        returns Core rows (no ORM instances). Fetches limit + 1 rows to find
+        out whether another page exists; backward pages are read in reverse
+        index order and flipped back. With sort="rank" the search is fuzzy
+        (pg_trgm word similarity); call set_similarity_threshold first.
+
+        Returns:
+            Tuple of (rows in display order, has_more in fetch direction).
+            Sort key values of a row are under "sort_key_<n>" labels.
+        """
+        keys, descending = self.sort_keys(sort, search)
+        backwards = cursor is not None and cursor.direction == DIRECTION_PREV
+
+        sort_columns = [key.label(f"sort_key_{i}") for i, key in enumerate(keys)]
+        query = self._list_query(*LIST_COLUMNS, *sort_columns)
+        query = self._apply_filters(
+            query, search, region_id, city_id, medical_card_number,
+            fuzzy=sort == SORT_RANK, location_id=location_id
+        )
+
+        if cursor is not None:
+            query = query.where(
+                keyset_condition(keys, cursor.values, descending, after=not backwards)
+            )
+
+        order_by = [
+            key.desc() if desc != backwards else key.asc()
+            for key, desc in zip(keys, descending)
+        ]
+        query = query.order_by(*order_by).limit(limit + 1)
+
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        rows = list(result.all())
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+
+        return rows, has_more
+
+    async def stream_export_rows(
+        self,
+        batch_size: int,
+        search: Optional[str] = None,
+        region_id: Optional[int] = None,
+        city_id: Optional[int] = None,
+        location_id: Optional[int] = None
+    ) -> AsyncIterator[list]:
+        """
+        Stream patient export rows in batches from a server-side cursor.
+
+        Selects plain columns (no ORM instances, no identity map), so memory
+        use is bounded by batch_size regardless of how many rows match.
+        """
+        query = self._list_query(*EXPORT_COLUMNS)
+        query = self._apply_filters(query, search, region_id, city_id, location_id=location_id)
+        query = query.order_by(Patient.id).execution_options(yield_per=batch_size)
+
+        result = await self.db.stream(query)
+        async for partition in result.partitions():
+            yield partition
 
     async def get_by_id(self, patient_id: int) -> Optional[Patient]:
         """Get patient by ID with medical card."""
@@ -50,24 +229,69 @@ class PatientRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_by_medical_card_number(self, card_number: str) -> Optional[Patient]:
-        """Get patient by medical card number."""
+    async def create_with_card(self, patient_data: PatientCreate, card_number: str) -> Optional[RowMapping]:
+        """
+        Create patient and medical card with one INSERT ... RETURNING statement.
+
+        The patient id is drawn from the patients sequence first, the card is
+        inserted with ON CONFLICT DO NOTHING and the patient row is inserted
+        only from the card that was actually written. If the card number is
+        already taken nothing is inserted and None is returned, so the caller
+        can retry with another number without an error or rollback.
+
+        Returns:
+            Patient columns plus card_id, card_number, card_created_at
+        """
+        patients = Patient.__table__
+        medical_cards = MedicalCard.__table__
+
+        new_id = select(
+            func.nextval(func.pg_get_serial_sequence(
+                literal_column("'patients'"), literal_column("'id'")
+            )).label("id")
+        ).cte("new_patient_id")
+
+        new_card = (
+            insert(medical_cards)
+            .from_select(
+                ["card_number", "patient_id"],
+                select(literal(card_number, medical_cards.c.card_number.type), new_id.c.id)
+            )
+            .on_conflict_do_nothing(index_elements=[medical_cards.c.card_number])
+            .returning(
+                medical_cards.c.id.label("card_id"),
+                medical_cards.c.card_number,
+                medical_cards.c.patient_id,
+                medical_cards.c.created_at.label("card_created_at"),
+            )
+            .cte("new_card")
+        )
+
+        values = patient_data.model_dump()
+        new_patient = (
+            insert(patients)
+            .from_select(
+                ["id", *values],
+                select(
+                    new_card.c.patient_id,
+                    *(literal(value, patients.c[field].type) for field, value in values.items())
+                )
+            )
+            .returning(*patients.c)
+            .cte("new_patient")
+        )
+
         result = await self.db.execute(
-            select(Patient)
-            .join(MedicalCard)
-            .where(MedicalCard.card_number == card_number)
-            .options(selectinload(Patient.medical_card))
+            select(new_patient, new_card.c.card_id, new_card.c.card_number, new_card.c.card_created_at)
+            .join(new_card, new_card.c.patient_id == new_patient.c.id)
         )
-        return result.scalar_one_or_none()
+        row = result.mappings().one_or_none()
+        if row is None:
+            logger.warning("Medical card number %s already taken", card_number)
+            return None
 
-    async def create(self, patient_data: PatientCreate) -> Patient:
-        """Create new patient."""
-        patient = Patient(**patient_data.model_dump())
-        self.db.add(patient)
-        await self.db.commit()
-        await self.db.refresh(patient)
-        logger.info(f"Created patient: {patient.first_name} {patient.last_name} (id={patient.id})")
-        return patient
+        logger.info("Created patient: %s %s (id=%s)", row["first_name"], row["last_name"], row["id"])
+        return row
 
     async def update(self, patient: Patient, patient_data: PatientUpdate) -> Patient:
         """Update patient."""
@@ -76,9 +300,8 @@ class PatientRepository:
         for field, value in update_data.items():
             setattr(patient, field, value)
 
-        await self.db.commit()
-        await self.db.refresh(patient)
-        logger.info(f"Updated patient: {patient.first_name} {patient.last_name} (id={patient.id})")
+        await self.db.flush()
+        logger.info("Updated patient: %s %s (id=%s)", patient.first_name, patient.last_name, patient.id)
         return patient
 
     async def delete(self, patient: Patient) -> None:
@@ -86,5 +309,5 @@ class PatientRepository:
         patient_id = patient.id
         patient_name = f"{patient.first_name} {patient.last_name}"
         await self.db.delete(patient)
-        await self.db.commit()
-        logger.info(f"Deleted patient: {patient_name} (id={patient_id})")
+        await self.db.flush()
+        logger.info("Deleted patient: %s (id=%s)", patient_name, patient_id)
@@ -0,0 +1,151 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    Column, Date, Integer, MetaData, String, Table, and_, exists, func, literal, literal_column, or_,
+    select, update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.schema import CreateTable
+from app.models.patient import Patient
+from app.models.medical_card import MedicalCard
+from app.models.region import Region
+from app.models.city import City
+from app.models.location import Location
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Temporary staging table (kept out of Base.metadata so Alembic never sees it).
+# Rows are cleared on every commit, the table lives as long as the connection,
+# so it is created (if missing) at the start of every batch.
+staging_metadata = MetaData()
+patient_import_staging = Table(
+    "patient_import_staging",
+    staging_metadata,
+    Column("line", Integer, nullable=False),
+    Column("card_number", String(6), nullable=False),
+    Column("first_name", String(100), nullable=False),
+    Column("last_name", String(100), nullable=False),
+    Column("middle_name", String(100)),
+    Column("birth_date", Date, nullable=False),
+    Column("gender", String(10), nullable=False),
+    Column("phone", String(20)),
+    Column("region_id", Integer),
+    Column("city_id", Integer),
+    Column("address", String(500)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+
+STAGING_COLUMNS = [column.name for column in patient_import_staging.columns]
+PATIENT_COLUMNS = STAGING_COLUMNS[2:]
+
+
+class PatientImportRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_staging_table(self) -> None:
+        """Create temporary staging table for this connection if missing."""
+        await self.db.execute(CreateTable(patient_import_staging, if_not_exists=True))
+
+    async def copy_to_staging(self, records: list[tuple]) -> None:
+        """Load records (in STAGING_COLUMNS order) with asyncpg binary COPY."""
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            patient_import_staging.name,
+            records=records,
+            columns=STAGING_COLUMNS,
+        )
+
+    async def delete_invalid_locations(self) -> list:
+        """
+        Remove staged rows with unknown region/city or a city outside its region.
+
+        Returns:
+            Removed rows as (line, region_id, city_id)
+        """
+        staging = patient_import_staging.c
+        region_missing = and_(
+            staging.region_id.is_not(None),
+            ~exists().where(Region.id == staging.region_id),
+        )
+        city_invalid = and_(
+            staging.city_id.is_not(None),
+            ~exists().where(
+                City.id == staging.city_id,
+                or_(staging.region_id.is_(None), City.region_id == staging.region_id),
+            ),
+        )
+        result = await self.db.execute(
+            patient_import_staging.delete()
+            .where(or_(region_missing, city_invalid))
+            .returning(staging.line, staging.region_id, staging.city_id)
+        )
+        return list(result.all())
+
+    async def get_taken_card_lines(self) -> list[int]:
+        """Lines whose staged card number is already issued (legacy random numbers)."""
+        result = await self.db.execute(
+            select(patient_import_staging.c.line)
+            .join(MedicalCard, MedicalCard.card_number == patient_import_staging.c.card_number)
+        )
+        return list(result.scalars().all())
+
+    async def replace_card_numbers(self, lines: list[int], card_numbers: list[str]) -> None:
+        """Assign new card numbers to staged lines."""
+        replacements = select(
+            func.unnest(literal(lines, ARRAY(Integer))).label("line"),
+            func.unnest(literal(card_numbers, ARRAY(String))).label("card_number"),
+        ).subquery()
+        await self.db.execute(
+            update(patient_import_staging)
+            .where(patient_import_staging.c.line == replacements.c.line)
+            .values(card_number=replacements.c.card_number)
+        )
+
+    async def merge_staging(self) -> int:
+        """
+        Insert all staged rows into patients and medical_cards in one statement.
+
+        Patient ids are drawn from the patients sequence up front so each card
+        can reference its patient without a round trip per row.
+
+        Returns:
+            Number of imported patients
+        """
+        patients = Patient.__table__
+        medical_cards = MedicalCard.__table__
+
+        staged = select(
+            patient_import_staging,
+            func.nextval(func.pg_get_serial_sequence(
+                literal_column("'patients'"), literal_column("'id'")
+            )).label("patient_id"),
+        ).order_by(patient_import_staging.c.line).cte("staged").prefix_with("MATERIALIZED")
+
+        # Patients are placed at the location node of their city, else of their region
+        location_id = func.coalesce(
+            select(Location.id).where(Location.city_id == staged.c.city_id).scalar_subquery(),
+            select(Location.id).where(Location.region_id == staged.c.region_id).scalar_subquery(),
+        )
+
+        inserted = (
+            insert(patients)
+            .from_select(
+                ["id", *PATIENT_COLUMNS, "location_id"],
+                select(staged.c.patient_id, *(staged.c[name] for name in PATIENT_COLUMNS), location_id),
+            )
+            .returning(patients.c.id)
+            .cte("inserted")
+        )
+
+        result = await self.db.execute(
+            insert(medical_cards)
+            .from_select(
+                ["card_number", "patient_id"],
+                select(staged.c.card_number, staged.c.patient_id)
+                .join(inserted, inserted.c.id == staged.c.patient_id),
+            )
+        )
+        return result.rowcount
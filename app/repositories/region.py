@@ -1,13 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, literal, BigInteger, String, RowMapping
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from app.models.region import Region
-from app.models.city import City
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Location catalog version counter and the channel workers listen on
+CATALOG_VERSION_SEQUENCE = "location_catalog_version_seq"
+CATALOG_CHANNEL = "location_catalog"
+# Transaction-level advisory lock key serializing catalog writers (see next_catalog_version)
+CATALOG_WRITE_LOCK = 0x4C4F43  # "LOC"
+
 
 class RegionRepository:
     def __init__(self, db: AsyncSession):
@@ -18,6 +24,13 @@ class RegionRepository:
         result = await self.db.execute(select(Region))
         return list(result.scalars().all())
 
+    async def get_all_rows(self) -> list[RowMapping]:
+        """Get all regions as rows (no ORM instances)."""
+        result = await self.db.execute(
+            select(Region.id, Region.name, Region.version).order_by(Region.id)
+        )
+        return list(result.mappings().all())
+
     async def get_by_id(self, region_id: int) -> Optional[Region]:
         """Get region by ID."""
         result = await self.db.execute(
@@ -45,35 +58,64 @@ class RegionRepository:
         """Create new region."""
         region = Region(name=name)
         self.db.add(region)
-        await self.db.commit()
-        await self.db.refresh(region)
-        logger.info(f"Created region: {region.name} (id={region.id})")
+        await self.db.flush()
+        logger.info("Created region: %s (id=%s)", region.name, region.id)
         return region
 
-    async def bulk_create(self, regions_data: list[dict]) -> list[Region]:
-        """Bulk create regions with cities."""
-        regions = []
-        for region_data in regions_data:
-            region = Region(name=region_data["name"])
-            self.db.add(region)
-            await self.db.flush()  # Get region.id
-
-            # Add cities
-            for city_name in region_data.get("cities", []):
-                city = City(name=city_name, region_id=region.id)
-                self.db.add(city)
-
-            regions.append(region)
-
-        await self.db.commit()
-        logger.info(f"Bulk created {len(regions)} regions with cities")
-        return regions
-
-    async def delete_all(self) -> None:
-        """Delete all regions (cascade deletes cities)."""
-        await self.db.execute(select(Region))
-        regions = (await self.db.execute(select(Region))).scalars().all()
-        for region in regions:
-            await self.db.delete(region)
-        await self.db.commit()
-        logger.info("Deleted all regions")
+    async def insert_missing(self, names: list[str], version: int) -> list[RowMapping]:
+        """
+        Insert regions whose names do not exist yet, in the given order.
+
+        Args:
+            names: Region names
+            version: Catalog version stamped on inserted rows
+
+        Returns:
+            Inserted rows (id, name)
+        """
+        source = func.unnest(literal(names, ARRAY(String))).table_valued(
+            "name", with_ordinality="ord"
+        ).render_derived("source")
+        result = await self.db.execute(
+            insert(Region)
+            .from_select(
+                ["name", "version"],
+                select(source.c.name, literal(version, BigInteger)).order_by(source.c.ord)
+            )
+            .on_conflict_do_nothing(index_elements=[Region.name])
+            .returning(Region.id, Region.name)
+        )
+        return list(result.mappings().all())
+
+    async def get_missing_from(self, names: list[str]) -> list[RowMapping]:
+        """Get regions (id, name) whose names are not in the given list."""
+        result = await self.db.execute(
+            select(Region.id, Region.name)
+            .where(Region.name != func.all(literal(names, ARRAY(String))))
+            .order_by(Region.id)
+        )
+        return list(result.mappings().all())
+
+    async def next_catalog_version(self) -> int:
+        """
+        Allocate the catalog version number for rows written by this transaction.
+
+        Takes the catalog write lock (held until commit or rollback) before
+        nextval, so catalog writes commit in version order: a client that
+        synced up to version V never misses rows stamped with V or lower
+        that commit later.
+        """
+        lock = (
+            select(func.pg_advisory_xact_lock(CATALOG_WRITE_LOCK))
+            .cte("catalog_lock")
+            .prefix_with("MATERIALIZED")
+        )
+        # One statement: the lock row is produced before nextval is evaluated
+        return await self.db.scalar(
+            select(func.nextval(CATALOG_VERSION_SEQUENCE)).select_from(lock)
+        )
+
+    async def notify_catalog_version(self, version: int) -> None:
+        """Notify all workers of a new catalog version (delivered on commit)."""
+        await self.db.execute(select(func.pg_notify(CATALOG_CHANNEL, str(version))))
+        logger.info("Publishing location catalog version %s", version)
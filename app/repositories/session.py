@@ -0,0 +1,84 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, RowMapping
+from typing import Optional
+from app.models.session import UserSession
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Channel workers listen on for revoked session ids (comma separated)
+SESSION_REVOKED_CHANNEL = "session_revoked"
+
+# Session ids per notification (NOTIFY payloads are limited to 8000 bytes)
+NOTIFY_BATCH_SIZE = 200
+
+
+class SessionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, session_id: str, user_id: int, refresh_token_hash: str, expires_at: datetime) -> None:
+        """Create login session."""
+        self.db.add(UserSession(
+            id=session_id,
+            user_id=user_id,
+            refresh_token_hash=refresh_token_hash,
+            expires_at=expires_at,
+        ))
+        await self.db.flush()
+        logger.info("Created session %s for user id=%s", session_id, user_id)
+
+    async def rotate(self, refresh_token_hash: str, new_hash: str, expires_at: datetime) -> Optional[RowMapping]:
+        """
+        Replace refresh token of the active session it belongs to.
+
+        One conditional UPDATE, so a refresh token can be used only once even
+        by concurrent requests.
+
+        Returns:
+            Row with id and user_id, or None if the token is unknown, revoked or expired
+        """
+        result = await self.db.execute(
+            update(UserSession)
+            .where(
+                UserSession.refresh_token_hash == refresh_token_hash,
+                UserSession.revoked_at.is_(None),
+                UserSession.expires_at > func.now(),
+            )
+            .values(refresh_token_hash=new_hash, expires_at=expires_at, updated_at=func.now())
+            .returning(UserSession.id, UserSession.user_id)
+        )
+        return result.mappings().one_or_none()
+
+    async def revoke(self, session_id: str) -> list[str]:
+        """Revoke one session; returns its id if it was active."""
+        return await self._revoke(UserSession.id == session_id)
+
+    async def revoke_user(self, user_id: int) -> list[str]:
+        """Revoke all active sessions of user; returns their ids."""
+        return await self._revoke(UserSession.user_id == user_id)
+
+    async def _revoke(self, condition) -> list[str]:
+        """Revoke matching active sessions and notify all workers (delivered on commit)."""
+        result = await self.db.execute(
+            update(UserSession)
+            .where(condition, UserSession.revoked_at.is_(None), UserSession.expires_at > func.now())
+            .values(revoked_at=func.now(), updated_at=func.now())
+            .returning(UserSession.id)
+        )
+        session_ids = list(result.scalars().all())
+        for start in range(0, len(session_ids), NOTIFY_BATCH_SIZE):
+            payload = ",".join(session_ids[start:start + NOTIFY_BATCH_SIZE])
+            await self.db.execute(select(func.pg_notify(SESSION_REVOKED_CHANNEL, payload)))
+        if session_ids:
+            logger.info("Revoked %s sessions", len(session_ids))
+        return session_ids
+
+    async def get_revoked_since(self, since: datetime) -> list[RowMapping]:
+        """Get id and revoked_at of sessions revoked after `since`."""
+        result = await self.db.execute(
+            select(UserSession.id, UserSession.revoked_at)
+            .where(UserSession.revoked_at.is_not(None), UserSession.revoked_at > since)
+        )
+        return list(result.mappings().all())
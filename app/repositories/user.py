@@ -1,21 +1,78 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, literal, literal_column, column, or_, RowMapping, Integer, String, Date
+from sqlalchemy.dialects.postgresql import insert, JSONB, ARRAY
 from typing import Optional
-from app.models.user import User
+from app.models.user import User, role_filter
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.pagination import Cursor, DIRECTION_PREV, keyset_condition
+from app.utils.roles import ROLE_BITS, roles_to_mask
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Columns selected for user list (UserListResponse)
+LIST_COLUMNS = (User.id, User.full_name, User.jshshir, User.password, User.roles, User.phone)
+
+# Existing roles followed by new ones, without duplicates (evaluated in ON CONFLICT DO UPDATE)
+MERGED_ROLES = literal_column(
+    "ARRAY(SELECT role FROM unnest(users.roles || excluded.roles) WITH ORDINALITY AS merged(role, ord) "
+    "GROUP BY role ORDER BY min(ord))"
+)
+
+# True for rows inserted by an upsert, false for rows that already existed
+WAS_INSERTED = literal_column("(xmax = 0)").label("created")
+
+# Columns written by user upserts
+UPSERT_COLUMNS = ("full_name", "jshshir", "password", "roles", "role_mask", "gender", "birth_date", "phone")
+
+# Keyset sort order for user lists (served by ix_users_name_keyset and the per-role partial indexes)
+USER_SORT_KEYS = (User.full_name, User.id)
+USER_SORT = "name"
+
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_all(self) -> list[User]:
-        """Get all users."""
-        result = await self.db.execute(select(User))
-        return list(result.scalars().all())
+    async def get_page(
+        self,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        roles: Optional[list[str]] = None
+    ) -> tuple[list[RowMapping], bool]:
+        """
+        Get one keyset page of user list rows ordered by (full_name, id).
+
+        Args:
+            limit: Page size
+            cursor: Decoded cursor (None for first page)
+            roles: Only users having any of these roles (bit tests on role_mask)
+
+        Returns:
+            Tuple of (rows in display order, has_more in fetch direction)
+        """
+        backwards = cursor is not None and cursor.direction == DIRECTION_PREV
+        query = select(*LIST_COLUMNS)
+
+        if roles:
+            # One partial index per role; several roles combine with BitmapOr
+            query = query.where(or_(*(role_filter(ROLE_BITS[role]) for role in roles)))
+
+        if cursor is not None:
+            query = query.where(
+                keyset_condition(USER_SORT_KEYS, cursor.values, (False, False), after=not backwards)
+            )
+
+        order_by = [key.desc() if backwards else key.asc() for key in USER_SORT_KEYS]
+        result = await self.db.execute(query.order_by(*order_by).limit(limit + 1))
+        rows = list(result.mappings().all())
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+
+        return rows, has_more
 
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
@@ -31,43 +88,105 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
 
-    async def create(self, user_data: UserCreate, password: str) -> User:
-        """Create new user with generated password."""
-        user = User(
-            full_name=user_data.full_name,
-            jshshir=user_data.jshshir,
-            password=password,
-            roles=[role.value for role in user_data.roles],  # Convert enum to string list
-            gender=user_data.gender,
-            birth_date=user_data.birth_date,
-            phone=user_data.phone
+    @staticmethod
+    def _upsert(statement):
+        """Merge roles into existing users with the same JSHSHIR, return rows with created flag."""
+        return statement.on_conflict_do_update(
+            index_elements=[User.jshshir],
+            set_={
+                "roles": MERGED_ROLES,
+                "role_mask": User.role_mask.op("|")(literal_column("excluded.role_mask")),
+                "updated_at": func.now(),
+            },
+        ).returning(*User.__table__.c, WAS_INSERTED)
+
+    async def upsert(self, user_data: UserCreate, password: str) -> RowMapping:
+        """
+        Create user, or add roles to the existing user with the same JSHSHIR.
+
+        One INSERT ... ON CONFLICT (jshshir) DO UPDATE statement, so
+        concurrent requests for the same JSHSHIR cannot race. The password
+        is only used when the user is created.
+
+        Returns:
+            User columns plus "created"
+        """
+        roles = [role.value for role in user_data.roles]  # Convert enum to string list
+        result = await self.db.execute(
+            self._upsert(insert(User).values(
+                full_name=user_data.full_name,
+                jshshir=user_data.jshshir,
+                password=password,
+                roles=roles,
+                role_mask=roles_to_mask(roles),
+                gender=user_data.gender,
+                birth_date=user_data.birth_date,
+                phone=user_data.phone
+            ))
         )
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
-        logger.info(f"Created user: {user.full_name} (jshshir={user.jshshir}, roles={user.roles})")
-        return user
+        row = result.mappings().one()
+        action = "Created" if row["created"] else "Merged roles of"
+        logger.info("%s user: %s (jshshir=%s, roles=%s)", action, row["full_name"], row["jshshir"], row["roles"])
+        return row
+
+    async def bulk_upsert(self, users: list[dict]) -> list[RowMapping]:
+        """
+        Upsert many users (JSON-compatible dicts with UPSERT_COLUMNS, unique jshshir) in one statement.
+
+        Rows are sent as a single JSONB parameter and expanded server-side
+        with jsonb_to_recordset, so statement size does not grow with the roster.
+
+        Returns:
+            User columns plus "created" for every row
+        """
+        source = func.jsonb_to_recordset(
+            literal(users, JSONB)
+        ).table_valued(
+            column("full_name", String),
+            column("jshshir", String),
+            column("password", String),
+            column("roles", ARRAY(String)),
+            column("role_mask", Integer),
+            column("gender", String),
+            column("birth_date", Date),
+            column("phone", String),
+        ).render_derived("source", with_types=True)
+
+        result = await self.db.execute(
+            self._upsert(insert(User).from_select(
+                list(UPSERT_COLUMNS), select(*(source.c[name] for name in UPSERT_COLUMNS))
+            ))
+        )
+        rows = list(result.mappings().all())
+        logger.info("Bulk upserted %s users", len(rows))
+        return rows
 
     async def update(self, user: User, user_data: UserUpdate) -> User:
         """Update user."""
         update_data = user_data.model_dump(exclude_unset=True)
 
-        # Convert roles enum to string if present
-        if "roles" in update_data and update_data["roles"]:
-            update_data["roles"] = [role.value for role in update_data["roles"]]
+        # Convert roles enum to string if present; the mask always follows (no roles: mask 0)
+        if "roles" in update_data:
+            update_data["roles"] = [role.value for role in update_data["roles"] or []]
+            update_data["role_mask"] = roles_to_mask(update_data["roles"])
 
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        await self.db.commit()
-        await self.db.refresh(user)
-        logger.info(f"Updated user: {user.full_name} (id={user.id})")
+        await self.db.flush()
+        logger.info("Updated user: %s (id=%s)", user.full_name, user.id)
         return user
 
+    async def set_password_hash(self, user: User, password_hash: str) -> None:
+        """Store (re)computed password hash of user."""
+        user.password_hash = password_hash
+        await self.db.flush()
+        logger.info("Updated password hash of user id=%s", user.id)
+
     async def delete(self, user: User) -> None:
         """Delete user."""
         user_id = user.id
         user_name = user.full_name
         await self.db.delete(user)
-        await self.db.commit()
-        logger.info(f"Deleted user: {user_name} (id={user_id})")
+        await self.db.flush()
+        logger.info("Deleted user: %s (id=%s)", user_name, user_id)
@@ -10,5 +10,18 @@ class LoginRequest(BaseModel):
 class LoginResponse(BaseModel):
     """Schema for login response"""
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
     user: dict  # User information
+
+
+class RefreshRequest(BaseModel):
+    """Schema for access token refresh request"""
+    refresh_token: str = Field(..., min_length=1, max_length=128)
+
+
+class TokenResponse(BaseModel):
+    """Schema for refreshed tokens (the refresh token is rotated on every use)"""
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
@@ -0,0 +1,48 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PoolHistogramBucket(BaseModel):
+    """Cumulative histogram bucket: checkouts that took at most `le` ms (None: +Inf)"""
+    le: Optional[float]
+    count: int
+
+
+class PoolStats(BaseModel):
+    """Connection pool gauges and counters of the worker that served the request"""
+    name: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_checked_out: int
+    checkouts: int
+    checkout_ms_avg: float
+    checkout_ms_max: float
+    checkout_ms_histogram: list[PoolHistogramBucket]
+    timeouts: int
+    pre_pings: int
+    pre_ping_failures: int
+
+
+class ReplicaStatus(BaseModel):
+    """Read replica routing state of the worker that served the request"""
+    configured: bool
+    healthy: bool
+    lag_seconds: Optional[float]
+    checked_at: Optional[float]  # Unix time of the last lag check
+
+
+class RouteQueryStats(BaseModel):
+    """SQL totals of one route since worker start (statement text normalized)"""
+    route: str
+    requests: int
+    queries: int
+    queries_per_request: float
+    max_queries: int
+    db_ms_total: float
+    db_ms_per_request: float
+    slowest_ms: float
+    slowest_fingerprint: Optional[str]
+    slowest_statement: Optional[str]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, ConfigDict
+from typing import Optional
 
 
 # Region schemas
@@ -37,3 +38,37 @@ class RegionWithCities(RegionResponse):
     cities: list[CityResponse] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Location hierarchy nodes (region -> district -> mahalla)
+class LocationCreate(BaseModel):
+    parent_id: int
+    name: str
+
+
+class LocationResponse(BaseModel):
+    id: int
+    parent_id: Optional[int] = None
+    level: str
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Full region -> city hierarchy (or delta since a catalog version)
+class LocationTree(BaseModel):
+    version: int
+    full: bool = True
+    regions: list[RegionWithCities] = []
+
+
+# Import result
+class LocationImportResult(BaseModel):
+    message: str
+    regions_count: int
+    cities_count: int
+    created_regions: list[RegionResponse] = []
+    created_cities: list[CityResponse] = []
+    # Present in the database but not in the source file (kept, patients may reference them)
+    missing_regions: list[RegionResponse] = []
+    missing_cities: list[CityResponse] = []
@@ -12,3 +12,15 @@ class MedicalCardResponse(MedicalCardBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class MedicalCardUtilization(BaseModel):
+    """Card number space usage (reserved includes numbers held in per-process blocks)"""
+    capacity: int
+    issued: int
+    reserved: int
+    remaining: int
+    block_size: int
+    reserved_blocks: int
+    issued_ratio: float
+    reserved_ratio: float
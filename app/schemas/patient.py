@@ -13,6 +13,7 @@ class PatientBase(BaseModel):
     phone: Optional[str] = None
     region_id: Optional[int] = None
     city_id: Optional[int] = None
+    location_id: Optional[int] = None
     address: Optional[str] = None
 
 
@@ -29,6 +30,7 @@ class PatientUpdate(BaseModel):
     phone: Optional[str] = None
     region_id: Optional[int] = None
     city_id: Optional[int] = None
+    location_id: Optional[int] = None
     address: Optional[str] = None
 
 
@@ -52,3 +54,25 @@ class PatientListResponse(BaseModel):
     medical_card: Optional[MedicalCardResponse] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PatientPage(BaseModel):
+    """Keyset-paginated patient list"""
+    items: list[PatientListResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class PatientImportError(BaseModel):
+    """Per-row bulk import error (line number in the source file)"""
+    line: int
+    error: str
+
+
+class PatientImportResult(BaseModel):
+    """Bulk patient import summary"""
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[PatientImportError] = []
@@ -57,3 +57,27 @@ class UserListResponse(BaseModel):
     phone: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserPage(BaseModel):
+    """Keyset-paginated user list"""
+    items: list[UserListResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class UserImportError(BaseModel):
+    """Per-row roster import error (line number in the source file)"""
+    line: int
+    error: str
+
+
+class UserImportResult(BaseModel):
+    """Staff roster import summary"""
+    total_rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[UserImportError] = []
+    created_users: list[UserListResponse] = []
@@ -1,17 +1,98 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from app.core.passwords import password_hasher
+from app.core.config import settings
+from app.models.user import User
+from app.repositories.session import SessionRepository
 from app.repositories.user import UserRepository
-from app.schemas.auth import LoginRequest, LoginResponse
+from app.schemas.auth import LoginRequest, LoginResponse, TokenResponse
+from app.db.unit_of_work import after_commit, savepoint
+from app.services.session_revocation import revoked_sessions
 from app.utils.jwt import create_access_token
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def new_refresh_token() -> tuple[str, str]:
+    """Generate opaque refresh token; returns (token, hash stored in the database)."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def refresh_token_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def user_access_token(user: User, session_id: str) -> str:
+    """Create access token for user within a login session."""
+    return create_access_token({
+        "sub": user.jshshir,
+        "user_id": user.id,
+        "sid": session_id,
+        "roles": user.roles,
+        "role_mask": user.role_mask,
+        "full_name": user.full_name
+    })
+
+
+def invalid_refresh_token_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.user_repo = UserRepository(db)
+        self.session_repo = SessionRepository(db)
+
+    async def _check_password(self, user: Optional[User], password: str) -> bool:
+        """
+        Check password of user, migrating it to a bcrypt hash on success.
+
+        Users without password_hash are checked against the legacy plain
+        password column and get a hash stored on first successful login.
+        Hashes with an outdated cost are replaced the same way. All bcrypt
+        work runs in the password hashing pool, not on the event loop.
+        """
+        if user is None:
+            # Same bcrypt cost as for existing users, so timing does not reveal them
+            await password_hasher.verify(password, None)
+            return False
+
+        if user.password_hash is not None:
+            valid, new_hash = await password_hasher.verify(password, user.password_hash)
+        else:
+            valid = hmac.compare_digest(user.password.encode(), password.encode())
+            if valid:
+                new_hash = await password_hasher.hash(password)
+            else:
+                # Pay the bcrypt cost anyway, so a wrong password looks like an unknown user
+                await password_hasher.verify(password, None)
+                new_hash = None
+
+        if new_hash is not None:
+            # Migrating the hash is best effort: a failure must not fail the login
+            try:
+                async with savepoint(self.db):
+                    await self.user_repo.set_password_hash(user, new_hash)
+            except SQLAlchemyError:
+                logger.exception("Failed to store password hash of user id=%s", user.id)
+        return valid
 
     async def login(self, login_data: LoginRequest) -> LoginResponse:
         """
@@ -26,43 +107,32 @@ class AuthService:
         Raises:
             HTTPException: If credentials are invalid
         """
-        logger.info(f"Login attempt for jshshir: {login_data.jshshir}")
+        logger.info("Login attempt for jshshir: %s", login_data.jshshir)
 
         # Get user by JSHSHIR
         user = await self.user_repo.get_by_jshshir(login_data.jshshir)
 
-        # Check if user exists
-        if not user:
-            logger.warning(f"Login failed: User not found with jshshir={login_data.jshshir}")
+        # Check user exists and password matches
+        if not await self._check_password(user, login_data.password):
+            logger.warning("Login failed: Invalid JSHSHIR or password for jshshir=%s", login_data.jshshir)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid JSHSHIR or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Check password (plain text comparison)
-        if user.password != login_data.password:
-            logger.warning(f"Login failed: Invalid password for jshshir={login_data.jshshir}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid JSHSHIR or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # Create session and tokens
+        session_id = secrets.token_hex(16)
+        refresh_token, refresh_hash = new_refresh_token()
+        await self.session_repo.create(session_id, user.id, refresh_hash, refresh_token_expiry())
+        access_token = user_access_token(user, session_id)
 
-        # Create JWT token
-        token_data = {
-            "sub": user.jshshir,
-            "user_id": user.id,
-            "roles": user.roles,
-            "full_name": user.full_name
-        }
-        access_token = create_access_token(token_data)
-
-        logger.info(f"Login successful for user: {user.full_name} (jshshir={user.jshshir})")
+        logger.info("Login successful for user: %s (jshshir=%s)", user.full_name, user.jshshir)
 
         # Return token and user data
         return LoginResponse(
             access_token=access_token,
+            refresh_token=refresh_token,
             token_type="bearer",
             user={
                 "id": user.id,
@@ -72,3 +142,39 @@ class AuthService:
                 "phone": user.phone
             }
         )
+
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        """
+        Issue new access token for the session of a refresh token.
+
+        The refresh token is rotated (the old one stops working) and the
+        access token is built from the current user row, so role changes
+        apply from the next refresh.
+
+        Raises:
+            HTTPException: If the refresh token is unknown, revoked or expired
+        """
+        new_token, new_hash = new_refresh_token()
+        session = await self.session_repo.rotate(
+            hash_refresh_token(refresh_token), new_hash, refresh_token_expiry()
+        )
+        if session is None or session["user_id"] is None:
+            logger.warning("Token refresh failed: unknown, revoked or expired refresh token")
+            raise invalid_refresh_token_exception()
+
+        user = await self.user_repo.get_by_id(session["user_id"])
+        if user is None:
+            raise invalid_refresh_token_exception()
+
+        logger.info("Refreshed session %s of user id=%s", session["id"], user.id)
+        return TokenResponse(
+            access_token=user_access_token(user, session["id"]),
+            refresh_token=new_token,
+        )
+
+    async def logout(self, session_id: str) -> None:
+        """Revoke login session; its access and refresh tokens stop working on all workers."""
+        revoked = await self.session_repo.revoke(session_id)
+        # Effective in this worker right after commit, other workers follow the notification
+        after_commit(self.db, lambda: revoked_sessions.add(revoked))
+        logger.info("Logged out session %s", session_id)
@@ -1,11 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
 import json
+from typing import Optional, Union
 from pathlib import Path
 from app.repositories.region import RegionRepository
 from app.repositories.city import CityRepository
-from app.schemas.location import RegionResponse, RegionWithCities, CityResponse
-from app.core.exceptions import not_found_exception
+from app.repositories.location import LocationRepository
+from app.db.unit_of_work import after_commit
+from app.services.location_catalog import location_catalog
+from app.schemas.location import (
+    RegionResponse, RegionWithCities, LocationCreate, LocationResponse, LocationImportResult
+)
+from app.models.location import LOCATION_LEVELS
+from app.core.exceptions import not_found_exception, validation_exception
+from app.core.responses import PrecomputedJSON
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -16,47 +23,131 @@ class LocationService:
         self.db = db
         self.region_repo = RegionRepository(db)
         self.city_repo = CityRepository(db)
+        self.location_repo = LocationRepository(db)
 
-    async def get_all_regions(self) -> list[RegionResponse]:
-        """Get all regions."""
+    async def get_all_regions(self) -> PrecomputedJSON:
+        """Get all regions as a pre-rendered JSON body."""
         logger.info("Fetching all regions")
-        regions = await self.region_repo.get_all()
-        return [RegionResponse.model_validate(region) for region in regions]
+        catalog = await location_catalog.get()
+        return catalog.regions_json
 
     async def get_region_by_id(self, region_id: int) -> RegionResponse:
         """Get region by ID."""
-        logger.info(f"Fetching region with id={region_id}")
-        region = await self.region_repo.get_by_id(region_id)
+        logger.info("Fetching region with id=%s", region_id)
+        catalog = await location_catalog.get()
+        region = catalog.regions_by_id.get(region_id)
         if not region:
             raise not_found_exception("Region", region_id)
-        return RegionResponse.model_validate(region)
+        return region
 
     async def get_region_with_cities(self, region_id: int) -> RegionWithCities:
         """Get region with cities."""
-        logger.info(f"Fetching region with cities for id={region_id}")
-        region = await self.region_repo.get_by_id_with_cities(region_id)
+        logger.info("Fetching region with cities for id=%s", region_id)
+        catalog = await location_catalog.get()
+        region = catalog.regions_by_id.get(region_id)
         if not region:
             raise not_found_exception("Region", region_id)
-        return RegionWithCities.model_validate(region)
+        return RegionWithCities(
+            id=region.id,
+            name=region.name,
+            cities=list(catalog.cities_by_region[region_id])
+        )
 
-    async def get_cities_by_region(self, region_id: int) -> list[CityResponse]:
-        """Get all cities in a region."""
-        logger.info(f"Fetching cities for region_id={region_id}")
+    async def get_cities_by_region(self, region_id: int) -> PrecomputedJSON:
+        """Get all cities in a region as a pre-rendered JSON body."""
+        logger.info("Fetching cities for region_id=%s", region_id)
+        catalog = await location_catalog.get()
 
         # Check if region exists
-        region = await self.region_repo.get_by_id(region_id)
-        if not region:
+        if region_id not in catalog.regions_by_id:
             raise not_found_exception("Region", region_id)
 
-        cities = await self.city_repo.get_by_region_id(region_id)
-        return [CityResponse.model_validate(city) for city in cities]
+        return catalog.cities_json_by_region[region_id]
+
+    async def get_all_cities(self) -> PrecomputedJSON:
+        """Get all cities as a pre-rendered JSON body."""
+        logger.info("Fetching all cities")
+        catalog = await location_catalog.get()
+        return catalog.cities_json
+
+    async def get_location_tree(self, since_version: Optional[int] = None) -> Union[PrecomputedJSON, dict]:
+        """
+        Get region -> city hierarchy.
+
+        Returns the pre-rendered full tree, or a delta dict with rows added
+        after since_version. A since_version ahead of the catalog (e.g. the
+        database was recreated) gets the full tree.
+        """
+        logger.info("Fetching location tree since_version=%s", since_version)
+        catalog = await location_catalog.get()
+        if since_version is None or since_version > catalog.version:
+            return catalog.tree_json
+        return catalog.tree_since(since_version)
+
+    async def get_location(self, location_id: int) -> LocationResponse:
+        """Get location hierarchy node by ID."""
+        logger.info("Fetching location with id=%s", location_id)
+        catalog = await location_catalog.get()
+        location = catalog.locations_by_id.get(location_id)
+        if not location:
+            raise not_found_exception("Location", location_id)
+        return location
+
+    async def get_location_children(self, location_id: int) -> list[LocationResponse]:
+        """Get direct children of a location hierarchy node."""
+        logger.info("Fetching children of location id=%s", location_id)
+        catalog = await location_catalog.get()
+        if location_id not in catalog.locations_by_id:
+            raise not_found_exception("Location", location_id)
+        return list(catalog.location_children[location_id])
+
+    async def create_location(self, location_data: LocationCreate) -> LocationResponse:
+        """
+        Create location node one level below its parent.
 
-    async def import_regions_from_json(self, json_file_path: str) -> dict:
+        Region and district levels mirror regions/cities and are managed
+        by the regions import, so new nodes go below district level.
+        """
+        logger.info("Creating location %s under id=%s", location_data.name, location_data.parent_id)
+        catalog = await location_catalog.get()
+
+        parent = catalog.locations_by_id.get(location_data.parent_id)
+        if not parent:
+            raise validation_exception(f"Location with id={location_data.parent_id} not found")
+
+        level_index = LOCATION_LEVELS.index(parent.level) + 1
+        if level_index < 2:
+            raise validation_exception("Districts are managed by the regions import")
+        if level_index >= len(LOCATION_LEVELS):
+            raise validation_exception(f"Locations of level '{parent.level}' cannot have children")
+
+        name = location_data.name.strip()
+        duplicate = validation_exception(f"Location '{name}' already exists under id={parent.id}")
+        if any(child.name == name for child in catalog.location_children[parent.id]):
+            raise duplicate
+
+        version = await self.region_repo.next_catalog_version()
+        row = await self.location_repo.create(parent.id, LOCATION_LEVELS[level_index], name, version)
+        if row is None:
+            # Created concurrently or by another worker since this catalog was loaded
+            raise duplicate
+        await self.region_repo.notify_catalog_version(version)
+        # This worker's catalog is current before the response goes out
+        after_commit(self.db, lambda: location_catalog.reload(min_version=version))
+        return LocationResponse.model_validate(dict(row))
+
+    async def import_regions_from_json(self, json_file_path: str) -> LocationImportResult:
         """
         Import regions and cities from JSON file.
-        This is a one-time admin operation.
+
+        The import is a diff against existing data: only regions and cities
+        not yet present are inserted (and mirrored as region/district nodes
+        of the location hierarchy), existing IDs (and patient references
+        to them) are kept. Regions/cities missing from the file are reported
+        but never deleted. Runs in one transaction with a fixed number of
+        statements regardless of file size.
         """
-        logger.info(f"Starting import from {json_file_path}")
+        logger.info("Starting import from %s", json_file_path)
 
         # Read JSON file
         file_path = Path(json_file_path)
@@ -66,32 +157,48 @@ class LocationService:
         with open(file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        # Clear existing data (optional - for fresh import)
-        await self.region_repo.delete_all()
-
-        # Prepare data for bulk insert
-        regions_data = []
+        # Flatten to unique region names and (region, city) pairs, keeping file order
+        region_names: dict[str, None] = {}
+        city_pairs: dict[tuple[str, str], None] = {}
         for item in data:
             # Handle both "region" and "reqion" (typo in JSON)
-            region_name = item.get("region") or item.get("reqion")
-            cities = item.get("cities", [])
-
-            regions_data.append({
-                "name": region_name,
-                "cities": cities
-            })
-
-        # Bulk create regions and cities
-        regions = await self.region_repo.bulk_create(regions_data)
-
-        total_cities = sum(len(r.cities) for r in regions)
+            region_name = (item.get("region") or item.get("reqion")).strip()
+            region_names[region_name] = None
+            for city_name in item.get("cities", []):
+                city_pairs[(region_name, city_name.strip())] = None
+
+        names = list(region_names)
+        city_region_names = [region for region, _ in city_pairs]
+        city_names = [city for _, city in city_pairs]
+
+        version = await self.region_repo.next_catalog_version()
+        created_regions = await self.region_repo.insert_missing(names, version)
+        created_cities = await self.city_repo.insert_missing(city_region_names, city_names, version)
+        missing_regions = await self.region_repo.get_missing_from(names)
+        missing_cities = await self.city_repo.get_missing_from(city_region_names, city_names)
+        # Mirror new regions/cities into the location hierarchy
+        created_nodes = await self.location_repo.insert_missing_legacy_nodes(version)
+
+        changed = bool(created_regions or created_cities or created_nodes)
+        if changed:
+            # Make every worker reload its location catalog once this commits
+            await self.region_repo.notify_catalog_version(version)
+            after_commit(self.db, lambda: location_catalog.reload(min_version=version))
 
         logger.info(
-            f"Import completed: {len(regions)} regions, {total_cities} cities"
+            "Import completed: %s regions, %s cities in file; "
+            "created %s regions, %s cities; "
+            "%s regions, %s cities not in file",
+            len(names), len(city_names), len(created_regions), len(created_cities),
+            len(missing_regions), len(missing_cities)
         )
 
-        return {
-            "message": "Import successful",
-            "regions_count": len(regions),
-            "cities_count": total_cities
-        }
+        return LocationImportResult(
+            message="Import successful",
+            regions_count=len(names),
+            cities_count=len(city_names),
+            created_regions=[dict(row) for row in created_regions],
+            created_cities=[dict(row) for row in created_cities],
+            missing_regions=[dict(row) for row in missing_regions],
+            missing_cities=[dict(row) for row in missing_cities],
+        )
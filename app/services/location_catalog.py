@@ -0,0 +1,212 @@
+"""
+In-process location catalog.
+
+Regions, cities and location hierarchy nodes only change through admin
+endpoints, so each worker keeps an immutable snapshot of them in memory
+and serves all location reads and patient location validation from it
+without touching the DB.
+
+The snapshot is replaced as a whole (a single reference swap), so readers
+always see one consistent version. Every region/city/location row carries
+the catalog version it was added in; the catalog version is the highest
+row version. After an import the new version is published with NOTIFY and
+every worker reloads (see app/db/listener.py).
+"""
+
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.instrumentation import untracked_queries
+from app.db.session import AsyncSessionLocal
+from app.repositories.region import RegionRepository
+from app.repositories.city import CityRepository
+from app.repositories.location import LocationRepository
+from app.schemas.location import RegionResponse, CityResponse, LocationResponse
+from app.core.responses import PrecomputedJSON
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class LocationCatalog:
+    """Immutable snapshot of all regions, cities and location hierarchy nodes."""
+    version: int
+    regions: tuple[RegionResponse, ...]
+    regions_by_id: Mapping[int, RegionResponse]
+    cities_by_id: Mapping[int, CityResponse]
+    cities_by_region: Mapping[int, tuple[CityResponse, ...]]
+    # Location hierarchy: nodes, children of each node, nodes mirroring regions/cities
+    locations_by_id: Mapping[int, LocationResponse]
+    location_children: Mapping[int, tuple[LocationResponse, ...]]
+    location_by_region: Mapping[int, int]
+    location_by_city: Mapping[int, int]
+    region_by_location: Mapping[int, int]
+    city_by_location: Mapping[int, int]
+    # Catalog version each row was added in
+    region_versions: Mapping[int, int]
+    city_versions: Mapping[int, int]
+    # Pre-rendered (and precompressed) endpoint bodies
+    regions_json: PrecomputedJSON
+    cities_json: PrecomputedJSON
+    cities_json_by_region: Mapping[int, PrecomputedJSON]
+    tree_json: PrecomputedJSON
+
+    @classmethod
+    def build(cls, region_rows, city_rows, location_rows=()) -> "LocationCatalog":
+        regions = tuple(RegionResponse.model_validate(dict(row)) for row in region_rows)
+        cities = [CityResponse.model_validate(dict(row)) for row in city_rows]
+        locations = [LocationResponse.model_validate(dict(row)) for row in location_rows]
+        region_versions = {row["id"]: row["version"] for row in region_rows}
+        city_versions = {row["id"]: row["version"] for row in city_rows}
+        version = max([
+            0,
+            *region_versions.values(),
+            *city_versions.values(),
+            *(row["version"] for row in location_rows),
+        ])
+
+        cities_by_region: dict[int, list[CityResponse]] = {region.id: [] for region in regions}
+        for city in cities:
+            cities_by_region.setdefault(city.region_id, []).append(city)
+
+        location_children: dict[int, list[LocationResponse]] = {location.id: [] for location in locations}
+        for location in locations:
+            if location.parent_id is not None:
+                location_children[location.parent_id].append(location)
+
+        catalog = dict(
+            version=version,
+            regions=regions,
+            regions_by_id=MappingProxyType({region.id: region for region in regions}),
+            cities_by_id=MappingProxyType({city.id: city for city in cities}),
+            cities_by_region=MappingProxyType(
+                {region_id: tuple(items) for region_id, items in cities_by_region.items()}
+            ),
+            locations_by_id=MappingProxyType({location.id: location for location in locations}),
+            location_children=MappingProxyType(
+                {location_id: tuple(items) for location_id, items in location_children.items()}
+            ),
+            location_by_region=MappingProxyType(
+                {row["region_id"]: row["id"] for row in location_rows if row["region_id"] is not None}
+            ),
+            location_by_city=MappingProxyType(
+                {row["city_id"]: row["id"] for row in location_rows if row["city_id"] is not None}
+            ),
+            region_by_location=MappingProxyType(
+                {row["id"]: row["region_id"] for row in location_rows if row["region_id"] is not None}
+            ),
+            city_by_location=MappingProxyType(
+                {row["id"]: row["city_id"] for row in location_rows if row["city_id"] is not None}
+            ),
+            region_versions=MappingProxyType(region_versions),
+            city_versions=MappingProxyType(city_versions),
+            regions_json=PrecomputedJSON.build([region.model_dump() for region in regions]),
+            cities_json=PrecomputedJSON.build([city.model_dump() for city in cities]),
+            cities_json_by_region=MappingProxyType({
+                region_id: PrecomputedJSON.build([city.model_dump() for city in items])
+                for region_id, items in cities_by_region.items()
+            }),
+        )
+        tree = _tree(version, regions, cities_by_region)
+        return cls(**catalog, tree_json=PrecomputedJSON.build(tree))
+
+    def location_ancestors(self, location_id: int) -> list[LocationResponse]:
+        """Location node followed by its ancestors up to the root."""
+        ancestors = []
+        location = self.locations_by_id.get(location_id)
+        while location is not None:
+            ancestors.append(location)
+            location = self.locations_by_id.get(location.parent_id)
+        return ancestors
+
+    def tree_since(self, since_version: int) -> dict:
+        """
+        LocationTree-shaped delta with rows added after since_version.
+
+        Regions are included when they are new or got new cities; their
+        `cities` hold only the new cities. Rows are never deleted, so
+        merging deltas into a full tree gives the current tree.
+        """
+        regions = []
+        cities_by_region = {}
+        for region in self.regions:
+            new_cities = [
+                city for city in self.cities_by_region[region.id]
+                if self.city_versions[city.id] > since_version
+            ]
+            if new_cities or self.region_versions[region.id] > since_version:
+                regions.append(region)
+                cities_by_region[region.id] = new_cities
+        return _tree(self.version, regions, cities_by_region, full=False)
+
+
+def _tree(version: int, regions, cities_by_region, full: bool = True) -> dict:
+    """Build LocationTree-shaped dict."""
+    return {
+        "version": version,
+        "full": full,
+        "regions": [
+            {**region.model_dump(), "cities": [city.model_dump() for city in cities_by_region[region.id]]}
+            for region in regions
+        ],
+    }
+
+
+async def load_catalog(db: AsyncSession) -> LocationCatalog:
+    """Read regions, cities and location nodes from one snapshot."""
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    region_rows = await RegionRepository(db).get_all_rows()
+    city_rows = await CityRepository(db).get_all_rows()
+    location_rows = await LocationRepository(db).get_all_rows()
+    return LocationCatalog.build(region_rows, city_rows, location_rows)
+
+
+class LocationCatalogStore:
+    """Holds the current catalog of this worker and swaps it on reload."""
+
+    def __init__(self):
+        self._catalog: Optional[LocationCatalog] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> LocationCatalog:
+        """Get current catalog, loading it on first use."""
+        catalog = self._catalog
+        if catalog is None:
+            catalog = await self.reload()
+        return catalog
+
+    async def reload(self, min_version: Optional[int] = None) -> LocationCatalog:
+        """
+        Load catalog from the database and swap it in.
+
+        Args:
+            min_version: Skip reload if the current catalog is already at least this version
+        """
+        async with self._lock:
+            current = self._catalog
+            if current is not None and min_version is not None and current.version >= min_version:
+                return current
+
+            # Shared cache fill: not part of the request that happened to trigger it
+            with untracked_queries():
+                async with AsyncSessionLocal() as db:
+                    catalog = await load_catalog(db)
+
+            self._catalog = catalog
+            logger.info(
+                "Location catalog loaded: version=%s, "
+                "%s regions, %s cities, "
+                "%s location nodes",
+                catalog.version, len(catalog.regions), len(catalog.cities_by_id), len(catalog.locations_by_id)
+            )
+            return catalog
+
+    async def handle_notification(self, payload: str) -> None:
+        """NOTIFY handler: reload if the published version is newer."""
+        await self.reload(min_version=int(payload))
+
+
+location_catalog = LocationCatalogStore()
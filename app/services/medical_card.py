@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.medical_card import MedicalCardRepository
+from app.schemas.medical_card import MedicalCardUtilization
+from app.utils.card_allocator import card_number_allocator, CAPACITY
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class MedicalCardService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.medical_card_repo = MedicalCardRepository(db)
+
+    async def get_utilization(self) -> MedicalCardUtilization:
+        """Report medical card number space utilization."""
+        logger.info("Fetching medical card number utilization")
+        issued = await self.medical_card_repo.count()
+        reserved_blocks = await card_number_allocator.reserved_blocks(self.db)
+        reserved = reserved_blocks * card_number_allocator.block_size
+
+        return MedicalCardUtilization(
+            capacity=CAPACITY,
+            issued=issued,
+            reserved=reserved,
+            remaining=CAPACITY - reserved,
+            block_size=card_number_allocator.block_size,
+            reserved_blocks=reserved_blocks,
+            issued_ratio=issued / CAPACITY,
+            reserved_ratio=reserved / CAPACITY,
+        )
@@ -1,140 +1,324 @@
+import csv
+import io
+import json
+from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from app.repositories.patient import PatientRepository
-from app.repositories.medical_card import MedicalCardRepository
-from app.repositories.region import RegionRepository
-from app.repositories.city import CityRepository
-from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse, PatientListResponse
-from app.utils.generators import generate_unique_medical_card_number
-from app.core.exceptions import not_found_exception, validation_exception
+from typing import AsyncIterator, Optional
+from app.repositories.patient import (
+    PatientRepository, EXPORT_COLUMNS, LIST_COLUMNS, SORT_RANK, search_tokens
+)
+from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
+from app.services.location_catalog import location_catalog
+from app.utils.card_allocator import CardNumberSpaceExhausted, card_number_allocator
+from app.utils.pagination import decode_cursor, page_cursors
+from app.core.config import settings
+from app.core.exceptions import not_found_exception, service_unavailable_exception, validation_exception
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def _export_value(value):
+    """Convert DB value to export representation (ISO dates, None stays None)."""
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _patient_list_item(row) -> dict:
+    """Build PatientListResponse-shaped dict from a patient list row."""
+    card = None
+    if row["card_id"] is not None:
+        card = {
+            "card_number": row["card_number"],
+            "id": row["card_id"],
+            "patient_id": row["id"],
+            "created_at": row["card_created_at"],
+        }
+    return {
+        "id": row["id"],
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+        "middle_name": row["middle_name"],
+        "birth_date": row["birth_date"],
+        "gender": row["gender"],
+        "phone": row["phone"],
+        "medical_card": card,
+    }
+
+
+def _patient_detail(row) -> dict:
+    """Build PatientResponse-shaped dict from a created patient row."""
+    detail = {key: row[key] for key in PatientResponse.model_fields if key != "medical_card"}
+    detail["medical_card"] = {
+        "card_number": row["card_number"],
+        "id": row["card_id"],
+        "patient_id": row["id"],
+        "created_at": row["card_created_at"],
+    }
+    return detail
+
+
 class PatientService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.patient_repo = PatientRepository(db)
-        self.medical_card_repo = MedicalCardRepository(db)
-        self.region_repo = RegionRepository(db)
-        self.city_repo = CityRepository(db)
 
-    async def get_all_patients(
+    async def get_patients_page(
         self,
+        limit: int,
+        sort: str = "name",
+        cursor: Optional[str] = None,
         search: Optional[str] = None,
+        search_mode: str = "contains",
+        min_similarity: Optional[float] = None,
         region_id: Optional[int] = None,
         city_id: Optional[int] = None,
-        medical_card_number: Optional[str] = None
-    ) -> list[PatientListResponse]:
-        """Get all patients with optional filters."""
+        medical_card_number: Optional[str] = None,
+        location_id: Optional[int] = None
+    ) -> dict:
+        """
+        Get one keyset page of patients with optional filters.
+
+        Returns a plain dict shaped like PatientPage, built directly from
+        Core rows (fast read path, no ORM instances or model validation).
+        In "fuzzy" search mode results are ranked by trigram similarity
+        (typo tolerant, multi-token) and the requested sort is ignored.
+        """
         logger.info(
-            f"Fetching patients with filters: search={search}, "
-            f"region_id={region_id}, city_id={city_id}, medical_card={medical_card_number}"
+            "Fetching patients page with filters: search=%s, search_mode=%s, "
+            "region_id=%s, city_id=%s, location_id=%s, "
+            "medical_card=%s, sort=%s, limit=%s",
+            search, search_mode, region_id, city_id, location_id, medical_card_number, sort, limit
         )
 
-        # If searching by medical card number, use specific query
-        if medical_card_number:
-            patient = await self.patient_repo.get_by_medical_card_number(medical_card_number)
-            if patient:
-                return [PatientListResponse.model_validate(patient)]
-            return []
+        if search and search_mode == "fuzzy":
+            if not search_tokens(search):
+                return {"items": [], "limit": limit, "next_cursor": None, "prev_cursor": None}
+            sort = SORT_RANK
+            if min_similarity is None:
+                min_similarity = settings.PATIENT_SEARCH_SIMILARITY_THRESHOLD
+            await self.patient_repo.set_similarity_threshold(min_similarity)
+
+        sort_keys, _ = self.patient_repo.sort_keys(sort, search)
+        decoded_cursor = decode_cursor(cursor, sort, sort_keys) if cursor else None
 
-        # Otherwise, use general query with filters
-        patients = await self.patient_repo.get_all(
+        rows, has_more = await self.patient_repo.get_page(
+            limit=limit,
+            sort=sort,
+            cursor=decoded_cursor,
             search=search,
             region_id=region_id,
-            city_id=city_id
+            city_id=city_id,
+            medical_card_number=medical_card_number,
+            location_id=location_id
+        )
+
+        next_cursor, prev_cursor = page_cursors(
+            sort,
+            rows,
+            lambda row: list(row[len(LIST_COLUMNS):]),
+            has_more,
+            decoded_cursor,
+        )
+
+        return {
+            "items": [_patient_list_item(row._mapping) for row in rows],
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
+        }
+
+    async def export_patients(
+        self,
+        export_format: str = "ndjson",
+        search: Optional[str] = None,
+        region_id: Optional[int] = None,
+        city_id: Optional[int] = None,
+        location_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Export patients as NDJSON or CSV text chunks.
+
+        Yields one chunk per server-side cursor batch, so the whole registry
+        is never held in memory.
+        """
+        logger.info(
+            "Exporting patients as %s: search=%s, "
+            "region_id=%s, city_id=%s, location_id=%s",
+            export_format, search, region_id, city_id, location_id
         )
-        return [PatientListResponse.model_validate(patient) for patient in patients]
+
+        columns = [column.key for column in EXPORT_COLUMNS]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == "csv" else None
+
+        if writer:
+            writer.writerow(columns)
+
+        total = 0
+        async for rows in self.patient_repo.stream_export_rows(
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            search=search,
+            region_id=region_id,
+            city_id=city_id,
+            location_id=location_id
+        ):
+            for row in rows:
+                values = [_export_value(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            total += len(rows)
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+        logger.info("Patients export completed: %s rows", total)
 
     async def get_patient_by_id(self, patient_id: int) -> PatientResponse:
         """Get patient by ID."""
-        logger.info(f"Fetching patient with id={patient_id}")
+        logger.info("Fetching patient with id=%s", patient_id)
         patient = await self.patient_repo.get_by_id(patient_id)
         if not patient:
             raise not_found_exception("Patient", patient_id)
         return PatientResponse.model_validate(patient)
 
-    async def create_patient(self, patient_data: PatientCreate) -> PatientResponse:
-        """Create new patient with automatic medical card generation."""
-        logger.info(f"Creating patient: {patient_data.first_name} {patient_data.last_name}")
+    async def _resolve_location(
+        self,
+        region_id: Optional[int],
+        city_id: Optional[int],
+        location_id: Optional[int] = None,
+        current_region_id: Optional[int] = None
+    ) -> tuple[Optional[int], Optional[int], Optional[int]]:
+        """
+        Validate region, city and location node against the location catalog.
+
+        A location node (e.g. a mahalla) determines region and city; given
+        region/city must then match it. Without a node the patient is placed
+        at the node of the city, else of the region.
+
+        Returns:
+            Tuple of (region_id, city_id, location_id) to store
+        """
+        if not region_id and not city_id and not location_id:
+            return region_id, city_id, location_id
+
+        catalog = await location_catalog.get()
+
+        if location_id:
+            ancestors = catalog.location_ancestors(location_id)
+            if not ancestors:
+                raise validation_exception(f"Location with id={location_id} not found")
+
+            node_region_id = next(
+                (catalog.region_by_location[node.id] for node in ancestors if node.id in catalog.region_by_location),
+                None
+            )
+            node_city_id = next(
+                (catalog.city_by_location[node.id] for node in ancestors if node.id in catalog.city_by_location),
+                None
+            )
+            if region_id and region_id != node_region_id:
+                raise validation_exception(
+                    f"Location with id={location_id} is not in region with id={region_id}"
+                )
+            if city_id and city_id != node_city_id:
+                raise validation_exception(
+                    f"Location with id={location_id} is not in city with id={city_id}"
+                )
+            return node_region_id, node_city_id, location_id
 
-        # Validate region and city if provided
-        if patient_data.region_id:
-            region = await self.region_repo.get_by_id(patient_data.region_id)
-            if not region:
-                raise validation_exception(f"Region with id={patient_data.region_id} not found")
+        if region_id and region_id not in catalog.regions_by_id:
+            raise validation_exception(f"Region with id={region_id} not found")
 
-        if patient_data.city_id:
-            city = await self.city_repo.get_by_id(patient_data.city_id)
-            if not city:
-                raise validation_exception(f"City with id={patient_data.city_id} not found")
+        if city_id:
+            city = catalog.cities_by_id.get(city_id)
+            if city is None:
+                raise validation_exception(f"City with id={city_id} not found")
 
             # Validate that city belongs to region
-            if patient_data.region_id and city.region_id != patient_data.region_id:
+            expected_region_id = region_id or current_region_id
+            if expected_region_id and city.region_id != expected_region_id:
                 raise validation_exception(
-                    f"City with id={patient_data.city_id} does not belong to "
-                    f"region with id={patient_data.region_id}"
+                    f"City with id={city_id} does not belong to "
+                    f"region with id={expected_region_id}"
                 )
+            return region_id, city_id, catalog.location_by_city.get(city_id)
+
+        return region_id, city_id, catalog.location_by_region.get(region_id)
 
-        # Create patient
-        patient = await self.patient_repo.create(patient_data)
+    async def create_patient(self, patient_data: PatientCreate) -> PatientResponse:
+        """
+        Create new patient with automatic medical card generation.
 
-        # Generate unique medical card number
-        card_number = await generate_unique_medical_card_number(self.db)
+        Patient and card are inserted by a single statement in one transaction,
+        so a patient never exists without a card.
+        """
+        logger.info("Creating patient: %s %s", patient_data.first_name, patient_data.last_name)
 
-        # Create medical card
-        await self.medical_card_repo.create(card_number, patient.id)
+        region_id, city_id, location_id = await self._resolve_location(
+            patient_data.region_id, patient_data.city_id, patient_data.location_id
+        )
+        patient_data = patient_data.model_copy(
+            update={"region_id": region_id, "city_id": city_id, "location_id": location_id}
+        )
 
-        # Refresh patient to get medical card
-        patient = await self.patient_repo.get_by_id(patient.id)
+        # Allocate medical card number (collision-free, no per-number DB probe).
+        # Retry only covers numbers already issued by the legacy random generator.
+        row = None
+        try:
+            while row is None:
+                card_number = await card_number_allocator.allocate(self.db)
+                row = await self.patient_repo.create_with_card(patient_data, card_number)
+        except CardNumberSpaceExhausted as e:
+            logger.error("Cannot create patient: %s", e)
+            raise service_unavailable_exception(str(e), retry_after=None)
 
         logger.info(
-            f"Patient created successfully: {patient.first_name} {patient.last_name} "
-            f"(id={patient.id}, card={card_number})"
+            "Patient created successfully: %s %s "
+            "(id=%s, card=%s)",
+            row["first_name"], row["last_name"], row["id"], card_number
         )
 
-        return PatientResponse.model_validate(patient)
+        return PatientResponse.model_validate(_patient_detail(row))
 
     async def update_patient(self, patient_id: int, patient_data: PatientUpdate) -> PatientResponse:
         """Update patient."""
-        logger.info(f"Updating patient with id={patient_id}")
+        logger.info("Updating patient with id=%s", patient_id)
 
         # Get existing patient
         patient = await self.patient_repo.get_by_id(patient_id)
         if not patient:
             raise not_found_exception("Patient", patient_id)
 
-        # Validate region and city if provided
-        if patient_data.region_id:
-            region = await self.region_repo.get_by_id(patient_data.region_id)
-            if not region:
-                raise validation_exception(f"Region with id={patient_data.region_id} not found")
-
-        if patient_data.city_id:
-            city = await self.city_repo.get_by_id(patient_data.city_id)
-            if not city:
-                raise validation_exception(f"City with id={patient_data.city_id} not found")
-
-            # Validate that city belongs to region
-            region_id = patient_data.region_id or patient.region_id
-            if region_id and city.region_id != region_id:
-                raise validation_exception(
-                    f"City with id={patient_data.city_id} does not belong to "
-                    f"region with id={region_id}"
-                )
+        location_fields = patient_data.model_fields_set & {"region_id", "city_id", "location_id"}
+        if location_fields:
+            region_id, city_id, location_id = await self._resolve_location(
+                patient_data.region_id, patient_data.city_id, patient_data.location_id, patient.region_id
+            )
+            resolved = {"region_id": region_id, "city_id": city_id, "location_id": location_id}
+            # Only fields that were sent or are implied by the resolved location
+            if "location_id" not in location_fields:
+                resolved = {key: resolved[key] for key in location_fields | {"location_id"}}
+            patient_data = patient_data.model_copy(update=resolved)
 
         # Update patient
         updated_patient = await self.patient_repo.update(patient, patient_data)
 
-        logger.info(f"Patient updated successfully: id={patient_id}")
+        logger.info("Patient updated successfully: id=%s", patient_id)
 
         return PatientResponse.model_validate(updated_patient)
 
     async def delete_patient(self, patient_id: int) -> None:
         """Delete patient (cascade deletes medical card)."""
-        logger.info(f"Deleting patient with id={patient_id}")
+        logger.info("Deleting patient with id=%s", patient_id)
 
         # Get existing patient
         patient = await self.patient_repo.get_by_id(patient_id)
@@ -144,4 +328,4 @@ class PatientService:
         # Delete patient
         await self.patient_repo.delete(patient)
 
-        logger.info(f"Patient deleted successfully: id={patient_id}")
+        logger.info("Patient deleted successfully: id=%s", patient_id)
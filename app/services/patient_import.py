@@ -0,0 +1,143 @@
+import itertools
+import json
+from typing import IO, Iterator
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db.query_budget import endpoint_budget
+from app.db.unit_of_work import commit
+from app.repositories.patient_import import PatientImportRepository, PATIENT_COLUMNS
+from app.schemas.patient import PatientCreate, PatientImportError, PatientImportResult
+from app.utils.card_allocator import CardNumberSpaceExhausted, card_number_allocator
+from app.utils.record_readers import iter_csv_records, iter_jsonl_records, format_validation_error
+from app.core.config import settings
+from app.core.exceptions import service_unavailable_exception
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def detect_import_format(filename: str) -> str:
+    """Guess import format from file name (.jsonl/.ndjson -> jsonl, otherwise csv)."""
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+class PatientImportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.import_repo = PatientImportRepository(db)
+
+    def _add_error(self, result: PatientImportResult, line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            result.errors.append(PatientImportError(line=line, error=error))
+
+    async def import_patients(self, stream: IO[str], import_format: str) -> PatientImportResult:
+        """
+        Bulk import patients from CSV or JSONL.
+
+        Each batch of rows is read and validated in a worker thread, then
+        loaded with COPY into a temporary staging table, checked against
+        regions/cities, given card numbers in bulk and merged into patients
+        and medical_cards with one statement. Each batch is committed on its
+        own. At most IMPORT_MAX_REPORTED_ERRORS row errors are returned;
+        failed counts all of them.
+        """
+        logger.info("Starting patient import (%s)", import_format)
+
+        records = iter_csv_records(stream) if import_format == "csv" else iter_jsonl_records(stream)
+        result = PatientImportResult()
+
+        while True:
+            # Reading and validating is CPU work on a blocking file: keep it off the event loop
+            batch, errors, row_count = await run_in_threadpool(
+                self._parse_batch, records, settings.IMPORT_BATCH_SIZE
+            )
+            if not row_count:
+                break
+            result.total_rows += row_count
+            for line, error in errors:
+                self._add_error(result, line, error)
+            if batch:
+                try:
+                    await self._import_batch(batch, result)
+                except CardNumberSpaceExhausted as e:
+                    # Earlier batches are committed: say how far the import got
+                    logger.error("Patient import stopped after %s rows: %s", result.imported, e)
+                    raise service_unavailable_exception(
+                        f"{e}; {result.imported} patients were imported before the import stopped",
+                        retry_after=None,
+                    )
+
+        result.errors.sort(key=lambda error: error.line)
+
+        logger.info(
+            "Patient import completed: total=%s, "
+            "imported=%s, failed=%s",
+            result.total_rows, result.imported, result.failed
+        )
+        return result
+
+    @staticmethod
+    def _parse_batch(
+        records: Iterator[tuple[int, object]], size: int
+    ) -> tuple[list[tuple], list[tuple[int, str]], int]:
+        """
+        Read and validate up to size records (runs in a worker thread).
+
+        Returns:
+            Tuple of (valid rows as (line, *PATIENT_COLUMNS), (line, error) pairs, records read)
+        """
+        batch, errors = [], []
+        row_count = 0
+        for line, record in itertools.islice(records, size):
+            row_count += 1
+
+            if isinstance(record, json.JSONDecodeError):
+                errors.append((line, f"Invalid JSON: {record.msg}"))
+                continue
+
+            try:
+                patient = PatientCreate.model_validate(record)
+            except ValidationError as e:
+                errors.append((line, format_validation_error(e)))
+                continue
+
+            batch.append((line, *(getattr(patient, name) for name in PATIENT_COLUMNS)))
+        return batch, errors, row_count
+
+    async def _import_batch(self, batch: list[tuple], result: PatientImportResult) -> None:
+        """Stage, validate and merge one batch of validated rows."""
+        # Constant number of statements per batch, plus one per medical card block it spans
+        blocks = -(-len(batch) // card_number_allocator.block_size) + 1
+        async with endpoint_budget(4 + blocks, "patient import batch"):
+            # The commit of the previous batch released its connection, so this
+            # batch may run on another one: the temporary table is per connection
+            await self.import_repo.create_staging_table()
+
+            card_numbers = await card_number_allocator.allocate_many(self.db, len(batch))
+            records = [
+                (row[0], card_number, *row[1:])
+                for row, card_number in zip(batch, card_numbers)
+            ]
+            await self.import_repo.copy_to_staging(records)
+
+            for line, region_id, city_id in await self.import_repo.delete_invalid_locations():
+                self._add_error(
+                    result, line,
+                    f"Unknown region_id={region_id} / city_id={city_id} or city does not belong to region"
+                )
+
+            # Only numbers issued by the legacy random generator can be taken
+            taken_lines = await self.import_repo.get_taken_card_lines()
+            while taken_lines:
+                replacements = await card_number_allocator.allocate_many(self.db, len(taken_lines))
+                await self.import_repo.replace_card_numbers(taken_lines, replacements)
+                taken_lines = await self.import_repo.get_taken_card_lines()
+
+            imported = await self.import_repo.merge_staging()
+            # Deliberate exception to one commit per request: bounded transactions for large files
+            await commit(self.db)
+
+        result.imported += imported
+        logger.info("Imported patient batch: %s rows", imported)
@@ -0,0 +1,71 @@
+"""
+In-memory set of revoked login sessions, shared by all workers.
+
+Access tokens are verified without touching the database, so revocation
+is enforced by checking the token's session id against this set: a dict
+lookup on the request path. Each worker loads revocations young enough to
+still matter on startup (and after a listener reconnect, since
+notifications may be missed while disconnected) and then follows the
+`session_revoked` channel, so a revocation reaches every worker as soon
+as the revoking transaction commits.
+
+An entry is only needed while access tokens of the session may still be
+valid, i.e. for ACCESS_TOKEN_EXPIRE_MINUTES after revocation; older
+entries are pruned.
+"""
+
+import time
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import AsyncSessionLocal
+from app.repositories.session import SessionRepository
+
+logger = get_logger(__name__)
+
+
+class RevokedSessions:
+    """Revoked session ids of this worker, each with the time it can be forgotten."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._revoked: dict[str, float] = {}
+        self._next_prune = 0.0
+
+    def is_revoked(self, session_id: str) -> bool:
+        return session_id in self._revoked
+
+    def add(self, session_ids, revoked_at: Optional[float] = None) -> None:
+        """Mark sessions revoked (revoked_at as Unix time, default now)."""
+        now = time.time()
+        forget_at = (revoked_at if revoked_at is not None else now) + self.ttl_seconds
+        for session_id in session_ids:
+            self._revoked[session_id] = max(forget_at, self._revoked.get(session_id, 0.0))
+        if now >= self._next_prune:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop entries whose access tokens have all expired."""
+        now = now if now is not None else time.time()
+        self._revoked = {sid: until for sid, until in self._revoked.items() if until > now}
+        self._next_prune = now + 60
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    async def reload(self) -> None:
+        """Load revocations that may still matter from the database."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        async with AsyncSessionLocal() as db:
+            rows = await SessionRepository(db).get_revoked_since(since)
+        for row in rows:
+            self.add((row["id"],), row["revoked_at"].timestamp())
+        logger.info("Session revocations loaded: %s active", len(self._revoked))
+
+    async def handle_notification(self, payload: str) -> None:
+        """NOTIFY handler: payload is a comma separated list of session ids."""
+        self.add(payload.split(","))
+
+
+revoked_sessions = RevokedSessions(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
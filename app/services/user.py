@@ -1,8 +1,20 @@
+from typing import IO, Optional
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.repositories.user import UserRepository
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
+from starlette.concurrency import run_in_threadpool
+from app.repositories.session import SessionRepository
+from app.repositories.user import UserRepository, USER_SORT, USER_SORT_KEYS
+from app.schemas.user import (
+    UserCreate, UserUpdate, UserResponse, UserListResponse, UserImportError, UserImportResult
+)
+from app.db.unit_of_work import after_commit
+from app.services.session_revocation import revoked_sessions
+from app.utils.record_readers import iter_csv_records, format_validation_error
 from app.utils.generators import generate_password
-from app.core.exceptions import not_found_exception, already_exists_exception
+from app.utils.pagination import decode_cursor, page_cursors
+from app.utils.roles import roles_to_mask
+from app.core.config import settings
+from app.core.exceptions import not_found_exception, already_exists_exception, validation_exception
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -12,16 +24,42 @@ class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.user_repo = UserRepository(db)
+        self.session_repo = SessionRepository(db)
+
+    async def get_users_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        roles: Optional[list[str]] = None
+    ) -> dict:
+        """
+        Get one keyset page of users (admin only), optionally filtered by roles.
+
+        Returns a plain dict shaped like UserPage built from Core rows.
+        """
+        logger.info("Fetching users page: roles=%s, limit=%s", roles, limit)
+
+        decoded_cursor = decode_cursor(cursor, USER_SORT, USER_SORT_KEYS) if cursor else None
+        rows, has_more = await self.user_repo.get_page(limit=limit, cursor=decoded_cursor, roles=roles)
+
+        next_cursor, prev_cursor = page_cursors(
+            USER_SORT,
+            rows,
+            lambda row: [row["full_name"], row["id"]],
+            has_more,
+            decoded_cursor,
+        )
 
-    async def get_all_users(self) -> list[UserListResponse]:
-        """Get all users (admin only)."""
-        logger.info("Fetching all users")
-        users = await self.user_repo.get_all()
-        return [UserListResponse.model_validate(user) for user in users]
+        return {
+            "items": [dict(row) for row in rows],
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
+        }
 
     async def get_user_by_id(self, user_id: int) -> UserResponse:
         """Get user by ID."""
-        logger.info(f"Fetching user with id={user_id}")
+        logger.info("Fetching user with id=%s", user_id)
         user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise not_found_exception("User", user_id)
@@ -29,45 +67,99 @@ class UserService:
 
     async def create_user(self, user_data: UserCreate) -> UserResponse:
         """Create new user with auto-generated password, or add roles to existing user."""
-        logger.info(f"Creating user: {user_data.full_name} (jshshir={user_data.jshshir})")
-
-        # Check if JSHSHIR already exists
-        existing_user = await self.user_repo.get_by_jshshir(user_data.jshshir)
-        if existing_user:
-            logger.info(f"User with jshshir={user_data.jshshir} already exists. Adding new roles.")
+        logger.info("Creating user: %s (jshshir=%s)", user_data.full_name, user_data.jshshir)
 
-            # Merge roles (avoid duplicates)
-            existing_roles = set(existing_user.roles)
-            new_roles = set(user_data.roles)
-            merged_roles = list(existing_roles | new_roles)
-
-            # Update user with merged roles
-            update_data = UserUpdate(roles=merged_roles)
-            updated_user = await self.user_repo.update(existing_user, update_data)
+        # Single upsert: creates the user or merges roles into the existing one
+        row = await self.user_repo.upsert(user_data, generate_password())
 
+        if row["created"]:
             logger.info(
-                f"Roles added to existing user: {updated_user.full_name} "
-                f"(id={updated_user.id}, old_roles={list(existing_roles)}, new_roles={merged_roles})"
+                "User created successfully: %s "
+                "(id=%s, jshshir=%s, password=%s)",
+                row["full_name"], row["id"], row["jshshir"], row["password"]
+            )
+        else:
+            logger.info(
+                "Roles added to existing user: %s "
+                "(id=%s, roles=%s)",
+                row["full_name"], row["id"], row["roles"]
             )
 
-            return UserResponse.model_validate(updated_user)
-
-        # Generate 6-digit password
-        password = generate_password()
-
-        # Create user
-        user = await self.user_repo.create(user_data, password)
+        return UserResponse.model_validate(dict(row))
+
+    @staticmethod
+    def _parse_roster(stream: IO[str], result: UserImportResult) -> dict[str, dict]:
+        """
+        Read and validate roster rows (runs in a worker thread).
+
+        Returns:
+            User rows for the upsert by JSHSHIR; row errors are added to result
+        """
+        users: dict[str, dict] = {}
+
+        for line, record in iter_csv_records(stream):
+            result.total_rows += 1
+            if result.total_rows > settings.ROSTER_MAX_ROWS:
+                raise validation_exception(f"Roster has more than {settings.ROSTER_MAX_ROWS} rows")
+            if record.get("roles"):
+                record["roles"] = [role.strip() for role in record["roles"].split(";") if role.strip()]
+            try:
+                user_data = UserCreate.model_validate(record)
+            except ValidationError as e:
+                result.failed += 1
+                if len(result.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                    result.errors.append(UserImportError(line=line, error=format_validation_error(e)))
+                continue
+
+            roles = [role.value for role in user_data.roles]
+            existing = users.get(user_data.jshshir)
+            if existing:
+                # Same person listed twice: merge roles, one row per JSHSHIR
+                existing["roles"] += [role for role in roles if role not in existing["roles"]]
+                existing["role_mask"] = roles_to_mask(existing["roles"])
+                continue
+
+            users[user_data.jshshir] = {
+                **user_data.model_dump(mode="json"),
+                "roles": roles,
+                "role_mask": roles_to_mask(roles),
+                "password": generate_password(),
+            }
+        return users
+
+    async def import_roster(self, stream: IO[str]) -> UserImportResult:
+        """
+        Provision staff from a roster CSV in one upsert statement.
+
+        Columns: full_name, jshshir, roles, gender, birth_date, phone.
+        Roles are separated by ";" (e.g. "shifokor;manager"). Existing users
+        (same JSHSHIR) keep their data and get the new roles merged in;
+        new users get a generated password. Rosters of more than
+        ROSTER_MAX_ROWS rows are rejected.
+        """
+        logger.info("Starting staff roster import")
+        result = UserImportResult()
+        # Reading and validating is CPU work on a blocking file: keep it off the event loop
+        users = await run_in_threadpool(self._parse_roster, stream, result)
+
+        rows = await self.user_repo.bulk_upsert(list(users.values())) if users else []
+        for row in rows:
+            if row["created"]:
+                result.created += 1
+                result.created_users.append(UserListResponse.model_validate(dict(row)))
+            else:
+                result.updated += 1
 
         logger.info(
-            f"User created successfully: {user.full_name} "
-            f"(id={user.id}, jshshir={user.jshshir}, password={password})"
+            "Roster import completed: %s rows, %s created, "
+            "%s updated, %s failed",
+            result.total_rows, result.created, result.updated, result.failed
         )
-
-        return UserResponse.model_validate(user)
+        return result
 
     async def update_user(self, user_id: int, user_data: UserUpdate) -> UserResponse:
         """Update user."""
-        logger.info(f"Updating user with id={user_id}")
+        logger.info("Updating user with id=%s", user_id)
 
         # Get existing user
         user = await self.user_repo.get_by_id(user_id)
@@ -83,20 +175,40 @@ class UserService:
         # Update user
         updated_user = await self.user_repo.update(user, user_data)
 
-        logger.info(f"User updated successfully: id={user_id}")
+        # Tokens carry roles and JSHSHIR; make the user log in again to get current ones
+        if "roles" in user_data.model_fields_set or user_data.jshshir is not None:
+            await self.revoke_sessions(user_id)
+
+        logger.info("User updated successfully: id=%s", user_id)
 
         return UserResponse.model_validate(updated_user)
 
     async def delete_user(self, user_id: int) -> None:
         """Delete user."""
-        logger.info(f"Deleting user with id={user_id}")
+        logger.info("Deleting user with id=%s", user_id)
 
         # Get existing user
         user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise not_found_exception("User", user_id)
 
+        # Revoke sessions first; they outlive the user row (user_id is set to NULL)
+        await self.revoke_sessions(user_id)
+
         # Delete user
         await self.user_repo.delete(user)
 
-        logger.info(f"User deleted successfully: id={user_id}")
+        logger.info("User deleted successfully: id=%s", user_id)
+
+    async def revoke_sessions(self, user_id: int) -> int:
+        """
+        Revoke all login sessions of user on all workers.
+
+        Returns:
+            Number of revoked sessions
+        """
+        revoked = await self.session_repo.revoke_user(user_id)
+        # Effective in this worker right after commit, other workers follow the notification
+        after_commit(self.db, lambda: revoked_sessions.add(revoked))
+        logger.info("Revoked %s sessions of user id=%s", len(revoked), user_id)
+        return len(revoked)
@@ -0,0 +1,142 @@
+"""
+Medical card number allocator.
+
+Card numbers have the format AA0000 (2 uppercase letters + 4 digits),
+i.e. 26 * 26 * 10000 = 6,760,000 possible numbers. Instead of guessing
+random numbers and probing the database for each guess, numbers are
+allocated from a counter:
+
+1. Each process reserves a block of counter values with one `nextval`
+   on the `medical_card_block_seq` sequence (atomic across processes).
+2. Counter values of the block are handed out locally, no DB access.
+3. Each counter value is mapped to a card number through a keyed
+   permutation (format-preserving Feistel network with cycle walking),
+   so numbers look random but two counter values never map to the same
+   card number.
+
+Allocation cost therefore does not grow as the number space fills up.
+"""
+
+import asyncio
+import hashlib
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS_SPACE = 10000
+CAPACITY = len(LETTERS) * len(LETTERS) * DIGITS_SPACE  # 6,760,000
+
+BLOCK_SEQUENCE = "medical_card_block_seq"
+
+# Feistel network over 24-bit values (2 x 12-bit halves), 2^24 >= CAPACITY
+_HALF_BITS = 12
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+
+class CardNumberSpaceExhausted(Exception):
+    """Raised when every card number has been allocated."""
+    pass
+
+
+def format_card_number(value: int) -> str:
+    """Format integer in [0, CAPACITY) as card number (e.g. 0 -> AA0000)."""
+    letters, digits = divmod(value, DIGITS_SPACE)
+    first, second = divmod(letters, len(LETTERS))
+    return f"{LETTERS[first]}{LETTERS[second]}{digits:04d}"
+
+
+def parse_card_number(card_number: str) -> int:
+    """Inverse of format_card_number."""
+    first = LETTERS.index(card_number[0])
+    second = LETTERS.index(card_number[1])
+    return (first * len(LETTERS) + second) * DIGITS_SPACE + int(card_number[2:])
+
+
+class CardNumberPermutation:
+    """Keyed bijection of [0, CAPACITY) onto itself."""
+
+    def __init__(self, key: str):
+        self._round_keys = [
+            hashlib.blake2b(key.encode("utf-8"), digest_size=16, person=b"card-round-%d" % i).digest()
+            for i in range(_ROUNDS)
+        ]
+
+    def _round(self, index: int, half: int) -> int:
+        digest = hashlib.blake2b(
+            half.to_bytes(2, "big"), digest_size=2, key=self._round_keys[index]
+        ).digest()
+        return int.from_bytes(digest, "big") & _HALF_MASK
+
+    def _encrypt24(self, value: int) -> int:
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for index in range(_ROUNDS):
+            left, right = right, left ^ self._round(index, right)
+        return (left << _HALF_BITS) | right
+
+    def permute(self, value: int) -> int:
+        """Map counter value to card number value (cycle walking keeps result < CAPACITY)."""
+        if not 0 <= value < CAPACITY:
+            raise ValueError(f"Value {value} outside card number space")
+        value = self._encrypt24(value)
+        while value >= CAPACITY:
+            value = self._encrypt24(value)
+        return value
+
+
+class MedicalCardNumberAllocator:
+    """Per-process allocator handing out card numbers from reserved sequence blocks."""
+
+    def __init__(self, key: str, block_size: int):
+        if CAPACITY % block_size:
+            raise ValueError(f"Block size must divide {CAPACITY}")
+        self.block_size = block_size
+        self.total_blocks = CAPACITY // block_size
+        self._permutation = CardNumberPermutation(key)
+        self._next_value = 0
+        self._block_end = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve_block(self, db: AsyncSession) -> None:
+        block = await db.scalar(select(func.nextval(BLOCK_SEQUENCE)))
+        if block >= self.total_blocks:
+            raise CardNumberSpaceExhausted("Medical card number space is exhausted")
+        self._next_value = block * self.block_size
+        self._block_end = self._next_value + self.block_size
+        logger.info("Reserved medical card number block %s", block)
+
+    async def allocate(self, db: AsyncSession) -> str:
+        """Allocate one card number (DB access only once per block)."""
+        return (await self.allocate_many(db, 1))[0]
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        """Allocate count card numbers, reserving as many blocks as needed."""
+        numbers = []
+        async with self._lock:
+            while len(numbers) < count:
+                if self._next_value >= self._block_end:
+                    await self._reserve_block(db)
+                take = min(count - len(numbers), self._block_end - self._next_value)
+                numbers.extend(
+                    format_card_number(self._permutation.permute(value))
+                    for value in range(self._next_value, self._next_value + take)
+                )
+                self._next_value += take
+        return numbers
+
+    async def reserved_blocks(self, db: AsyncSession) -> int:
+        """Number of blocks reserved by all processes so far."""
+        last_block = await db.scalar(
+            select(func.pg_sequence_last_value(literal_column(f"'{BLOCK_SEQUENCE}'::regclass")))
+        )
+        return 0 if last_block is None else last_block + 1
+
+
+card_number_allocator = MedicalCardNumberAllocator(
+    key=settings.MEDICAL_CARD_KEY,
+    block_size=settings.MEDICAL_CARD_BLOCK_SIZE,
+)
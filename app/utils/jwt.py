@@ -7,9 +7,9 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 # JWT settings
-SECRET_KEY = settings.DATABASE_URL  # Temporary, should use dedicated secret key
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.JWT_ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -33,7 +33,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-    logger.info(f"Created access token for user: {data.get('sub')}")
+    logger.info("Created access token for user: %s", data.get("sub"))
     return encoded_jwt
 
 
@@ -51,5 +51,5 @@ def decode_access_token(token: str) -> Optional[dict]:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError as e:
-        logger.warning(f"Failed to decode token: {e}")
+        logger.warning("Failed to decode token: %s", e)
         return None
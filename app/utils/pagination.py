@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key
+values of the boundary row plus the pagination direction. Pages are fetched
+with a `WHERE (keys) > (cursor values)` predicate instead of OFFSET, so the
+cost of a page does not depend on how deep it is and rows inserted between
+requests never shift or duplicate already-returned rows.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+from app.core.exceptions import validation_exception
+
+DIRECTION_NEXT = "next"
+DIRECTION_PREV = "prev"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Decoded pagination cursor."""
+    sort: str
+    values: tuple
+    direction: str = DIRECTION_NEXT
+
+
+def encode_cursor(sort: str, values: Sequence[Any], direction: str = DIRECTION_NEXT) -> str:
+    """Encode sort key values into an opaque cursor string."""
+    payload = json.dumps(
+        {"s": sort, "v": list(values), "d": direction},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _key_python_type(key: ColumnElement) -> Optional[type]:
+    """Python type of a sort key's values (None: unknown, not checked)."""
+    try:
+        return key.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _matches_key_type(value: Any, key: ColumnElement) -> bool:
+    expected = _key_python_type(key)
+    if value is None or isinstance(value, bool):
+        return False  # sort keys are NOT NULL; JSON true/false are never key values
+    if expected is None:
+        return True
+    if expected is float:
+        return isinstance(value, (int, float))  # JSON may write a whole float as int
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, sort: str, keys: Sequence[ColumnElement]) -> Cursor:
+    """
+    Decode cursor string produced by encode_cursor.
+
+    Values are checked against the types of the sort keys, so a crafted
+    cursor cannot reach the database with e.g. a string for an integer id.
+
+    Raises:
+        HTTPException: If cursor is malformed or was issued for another sort order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_sort = payload["s"]
+        values = tuple(payload["v"])
+        direction = payload["d"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise validation_exception("Invalid pagination cursor")
+
+    if cursor_sort != sort or len(values) != len(keys) or direction not in (DIRECTION_NEXT, DIRECTION_PREV):
+        raise validation_exception("Pagination cursor does not match requested sort order")
+
+    if not all(_matches_key_type(value, key) for value, key in zip(values, keys)):
+        raise validation_exception("Invalid pagination cursor")
+
+    return Cursor(sort=cursor_sort, values=values, direction=direction)
+
+
+def keyset_condition(
+    keys: Sequence[ColumnElement],
+    values: Sequence[Any],
+    descending: Sequence[bool],
+    after: bool = True,
+) -> ColumnElement:
+    """
+    Build WHERE condition selecting rows after (or before) the given key values.
+
+    Uses a row-value comparison when all keys sort in the same direction,
+    which PostgreSQL can answer with a single index range scan. Mixed
+    directions fall back to the equivalent expanded OR chain.
+    """
+    if len(set(descending)) == 1:
+        greater = after != descending[0]
+        left, right = tuple_(*keys), tuple_(*values)
+        return left > right if greater else left < right
+
+    clauses = []
+    for i, (key, value, desc) in enumerate(zip(keys, values, descending)):
+        equal_prefix = [keys[j] == values[j] for j in range(i)]
+        greater = after != desc
+        clauses.append(and_(*equal_prefix, key > value if greater else key < value))
+    return or_(*clauses)
+
+
+def page_cursors(
+    sort: str,
+    rows: list,
+    key_values,
+    has_more: bool,
+    cursor: Optional[Cursor],
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Build (next_cursor, prev_cursor) for a fetched page.
+
+    Args:
+        sort: Sort order name stored in the cursor
+        rows: Page rows in display order
+        key_values: Callable returning sort key values of a row
+        has_more: Whether more rows exist beyond the page in fetch direction
+        cursor: Cursor the page was requested with (None for first page)
+    """
+    if not rows:
+        return None, None
+
+    backwards = cursor is not None and cursor.direction == DIRECTION_PREV
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else cursor is not None
+
+    next_cursor = encode_cursor(sort, key_values(rows[-1]), DIRECTION_NEXT) if has_next else None
+    prev_cursor = encode_cursor(sort, key_values(rows[0]), DIRECTION_PREV) if has_prev else None
+    return next_cursor, prev_cursor
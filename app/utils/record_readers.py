@@ -0,0 +1,37 @@
+"""
+Record readers for bulk imports (CSV with a header row, JSON Lines).
+
+Readers yield (source line number, record) so that services can report
+per-row errors against the uploaded file.
+"""
+
+import csv
+import json
+from typing import IO, Iterator
+from pydantic import ValidationError
+
+
+def iter_csv_records(stream: IO[str]) -> Iterator[tuple[int, object]]:
+    """Yield (line number, record) from CSV with a header row; empty cells become None."""
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, {key: value or None for key, value in record.items()}
+
+
+def iter_jsonl_records(stream: IO[str]) -> Iterator[tuple[int, object]]:
+    """Yield (line number, record) from JSON Lines; unparsable lines yield the error."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, e
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """One-line description of a row's validation errors ("field: message; ...")."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
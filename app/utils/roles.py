@@ -0,0 +1,35 @@
+"""
+User role bitmask.
+
+Each UserRole has a fixed bit; a user's roles are stored as the OR of
+their bits in users.role_mask, so role checks are a single AND and role
+filters can use per-role partial indexes. Bit values are persisted:
+never renumber them, only add new bits.
+"""
+
+from typing import Iterable
+from app.schemas.user import UserRole
+
+ROLE_BITS = {
+    UserRole.MANAGER: 1 << 0,
+    UserRole.DOCTOR: 1 << 1,
+    UserRole.NURSE: 1 << 2,
+    UserRole.RECEPTIONIST: 1 << 3,
+    UserRole.PATRONAGE_NURSE: 1 << 4,
+}
+
+
+def roles_to_mask(roles: Iterable[str]) -> int:
+    """Convert role names (or UserRole values) to a bitmask; unknown names are ignored."""
+    mask = 0
+    for role in roles:
+        try:
+            mask |= ROLE_BITS[UserRole(role)]
+        except ValueError:
+            continue
+    return mask
+
+
+def has_any_role(mask: int, required_mask: int) -> bool:
+    """True if mask has at least one of the roles in required_mask."""
+    return bool(mask & required_mask)
@@ -0,0 +1,76 @@
+"""
+Benchmark: bearer token verification per request, uncached vs LRU cache.
+
+Uncached is what every request would pay without the cache: HS256
+signature check, JSON decode, expiry and claim parsing. Cached is the
+get_current_user path on a hit: token hash + LRU lookup + expiry check +
+revocation check (against --revoked other revoked sessions).
+Tokens are spread over a pool of distinct users to exercise the LRU.
+
+    python -m benchmarks.auth_tokens --iterations 20000 --tokens 1000 --revoked 10000
+"""
+
+import argparse
+import time
+from app.core.security import TokenCache, authenticate_token, token_cache, verify_token
+from app.services.session_revocation import revoked_sessions
+from app.utils.jwt import create_access_token
+
+
+def make_tokens(count: int) -> list[str]:
+    return [
+        create_access_token({
+            "sub": f"{i:014d}",
+            "user_id": i,
+            "sid": f"{i:032x}",
+            "roles": ["shifokor"],
+            "role_mask": 2,
+            "full_name": f"User {i}",
+        })
+        for i in range(count)
+    ]
+
+
+def measure(verify, tokens: list[str], iterations: int) -> float:
+    """Return microseconds per verification."""
+    started = time.perf_counter()
+    for i in range(iterations):
+        assert verify(tokens[i % len(tokens)]) is not None
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=1000, help="Distinct tokens (must fit the cache)")
+    parser.add_argument("--revoked", type=int, default=10000, help="Other revoked sessions in the set")
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.tokens)
+    revoked_sessions.add(f"revoked{i:025x}" for i in range(args.revoked))
+    session_ids = [f"{i:032x}" for i in range(args.tokens)]
+
+    uncached = measure(verify_token, tokens, args.iterations)
+
+    token_cache.clear()
+    for token in tokens:
+        authenticate_token(token)
+    cached = measure(authenticate_token, tokens, args.iterations)
+
+    hashing = measure(TokenCache.key, tokens, args.iterations)
+    revocation = measure(lambda sid: not revoked_sessions.is_revoked(sid), session_ids, args.iterations)
+
+    print(f"{'path':<24}  {'us/request':>10}  {'requests/sec':>12}")
+    rows = (
+        ("uncached (verify)", uncached),
+        ("cached (LRU hit)", cached),
+        ("  of which token hash", hashing),
+        ("  of which revocation", revocation),
+    )
+    for name, micros in rows:
+        print(f"{name:<24}  {micros:>10.2f}  {1e6 / micros:>12,.0f}")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
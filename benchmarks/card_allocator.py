@@ -0,0 +1,75 @@
+"""
+Benchmark: medical card number allocation as the number space fills.
+
+Compares the legacy strategy (random AA0000 guess + one uniqueness probe
+per guess) with the block/permutation allocator at increasing fill
+levels. Probes are simulated in memory (a uniform guess hits a taken
+number with probability equal to the fill level), so the numbers show
+attempts per allocation (each attempt was one SELECT round trip before)
+and pure allocation throughput. No database is needed.
+
+    python -m benchmarks.card_allocator --samples 20000
+"""
+
+import argparse
+import random
+import time
+from app.utils.card_allocator import CAPACITY, CardNumberPermutation, format_card_number
+
+FILL_LEVELS = (0.0, 0.25, 0.5, 0.75, 0.9, 0.99)
+BLOCK_SIZE = 100
+
+
+def random_probe(filled: int, samples: int) -> tuple[float, float]:
+    """Legacy strategy: returns (allocations/sec, attempts per allocation)."""
+    attempts = 0
+    started = time.perf_counter()
+    for _ in range(samples):
+        while True:
+            attempts += 1
+            # Numbers below `filled` stand for already issued cards
+            value = random.randrange(CAPACITY)
+            if value >= filled:
+                format_card_number(value)
+                break
+    elapsed = time.perf_counter() - started
+    return samples / elapsed, attempts / samples
+
+
+def permutation(permute, start: int, samples: int) -> tuple[float, float]:
+    """Block allocator: returns (allocations/sec, sequence round trips per allocation)."""
+    started = time.perf_counter()
+    for value in range(start, start + samples):
+        format_card_number(permute(value))
+    elapsed = time.perf_counter() - started
+    return samples / elapsed, 1 / BLOCK_SIZE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="DB round trip used for effective rates")
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+
+    permute = CardNumberPermutation("benchmark-key").permute
+    print(f"effective = allocations/sec including {args.rtt_ms} ms per DB round trip")
+    print(
+        f"{'fill':>6}  {'probes/alloc':>12}  {'random eff/sec':>14}  "
+        f"{'DB trips/alloc':>14}  {'perm cpu/sec':>12}  {'perm eff/sec':>12}"
+    )
+    for fill in FILL_LEVELS:
+        filled = int(CAPACITY * fill)
+        samples = min(args.samples, CAPACITY - filled)
+        random_rate, probes = random_probe(filled, samples)
+        perm_rate, trips = permutation(permute, filled, samples)
+        random_effective = 1 / (1 / random_rate + probes * rtt)
+        perm_effective = 1 / (1 / perm_rate + trips * rtt)
+        print(
+            f"{fill:>6.0%}  {probes:>12.2f}  {random_effective:>14,.0f}  "
+            f"{trips:>14.2f}  {perm_rate:>12,.0f}  {perm_effective:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
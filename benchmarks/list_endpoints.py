@@ -0,0 +1,150 @@
+"""
+Benchmark: ORM list path vs Core-row fast path.
+
+Walks the whole patients table page by page (and reads full user and
+city lists) with both read paths and reports rows/sec and peak Python
+memory (tracemalloc) per path.
+
+    ORM path:  select(Model) + selectinload -> model_validate ->
+               response_model re-validation -> JSON
+    Fast path: select(columns) with card joined -> dict rows -> JSON bytes
+
+Usage (against the database from DATABASE_URL):
+
+    python -m benchmarks.list_endpoints --page-size 500 --repeat 3
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+import app.main  # noqa: F401  (configures mappers and logging)
+from app.db.session import AsyncSessionLocal
+from app.models.city import City
+from app.models.patient import Patient
+from app.models.user import User
+from app.repositories.patient import PatientRepository
+from app.repositories.user import UserRepository
+from app.repositories.city import CityRepository
+from app.schemas.location import CityResponse
+from app.schemas.patient import PatientListResponse
+from app.schemas.user import UserListResponse
+from app.services.patient import _patient_list_item
+from app.utils.pagination import Cursor
+from app.utils.serialization import dumps
+
+patient_list_adapter = TypeAdapter(list[PatientListResponse])
+user_list_adapter = TypeAdapter(list[UserListResponse])
+city_list_adapter = TypeAdapter(list[CityResponse])
+
+
+async def orm_patients(session, page_size: int) -> int:
+    """Previous path: ORM instances, second selectinload query, double validation."""
+    total, last_id = 0, 0
+    while True:
+        result = await session.execute(
+            select(Patient)
+            .options(selectinload(Patient.medical_card))
+            .where(Patient.id > last_id)
+            .order_by(Patient.id)
+            .limit(page_size)
+        )
+        patients = list(result.scalars().all())
+        if not patients:
+            return total
+        models = [PatientListResponse.model_validate(patient) for patient in patients]
+        patient_list_adapter.dump_json(patient_list_adapter.validate_python(models))
+        total += len(patients)
+        last_id = patients[-1].id
+        session.expunge_all()
+
+
+async def fast_patients(session, page_size: int) -> int:
+    """Fast path: Core rows with joined card serialized straight to bytes."""
+    repo = PatientRepository(session)
+    total, cursor = 0, None
+    while True:
+        rows, has_more = await repo.get_page(limit=page_size, sort="id", cursor=cursor)
+        if not rows:
+            return total
+        dumps({"items": [_patient_list_item(row._mapping) for row in rows]})
+        total += len(rows)
+        if not has_more:
+            return total
+        cursor = Cursor(sort="id", values=(rows[-1].id,))
+
+
+async def orm_users(session, _: int) -> int:
+    users = list((await session.execute(select(User))).scalars().all())
+    models = [UserListResponse.model_validate(user) for user in users]
+    user_list_adapter.dump_json(user_list_adapter.validate_python(models))
+    session.expunge_all()
+    return len(users)
+
+
+async def fast_users(session, _: int) -> int:
+    rows = await UserRepository(session).get_all_rows()
+    dumps([dict(row) for row in rows])
+    return len(rows)
+
+
+async def orm_cities(session, _: int) -> int:
+    region_ids = (await session.execute(select(City.region_id).distinct())).scalars().all()
+    total = 0
+    for region_id in region_ids:
+        cities = list((await session.execute(select(City).where(City.region_id == region_id))).scalars().all())
+        models = [CityResponse.model_validate(city) for city in cities]
+        city_list_adapter.dump_json(city_list_adapter.validate_python(models))
+        total += len(cities)
+    session.expunge_all()
+    return total
+
+
+async def fast_cities(session, _: int) -> int:
+    region_ids = (await session.execute(select(City.region_id).distinct())).scalars().all()
+    repo = CityRepository(session)
+    total = 0
+    for region_id in region_ids:
+        rows = await repo.get_rows_by_region_id(region_id)
+        dumps([dict(row) for row in rows])
+        total += len(rows)
+    return total
+
+
+async def measure(name: str, func, page_size: int, repeat: int) -> None:
+    best_rate, peak = 0.0, 0
+    rows = 0
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as session:
+            tracemalloc.start()
+            started = time.perf_counter()
+            rows = await func(session, page_size)
+            elapsed = time.perf_counter() - started
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        best_rate = max(best_rate, rows / elapsed if elapsed else 0.0)
+    print(f"{name:<16} rows={rows:>9}  rows/sec={best_rate:>12,.0f}  peak_mem={peak / 1024 / 1024:>8.2f} MiB")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, func in (
+        ("patients orm", orm_patients),
+        ("patients fast", fast_patients),
+        ("users orm", orm_users),
+        ("users fast", fast_users),
+        ("cities orm", orm_cities),
+        ("cities fast", fast_cities),
+    ):
+        await measure(name, func, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Benchmark: request throughput with logging off, synchronous and queued.
+
+Serves a handler that logs like a service method (three INFO records
+per request) through the ASGI stack in-process, at fixed concurrency:
+
+    off    LOG_LEVEL=WARNING: INFO calls stop at the level check
+    sync   file handler attached directly to the root logger: every
+           record is formatted and written on the event loop (the old setup)
+    queue  app.core.logging pipeline: records are queued, a listener
+           thread formats and writes them
+
+--stall-ms/--stall-every model slow disk writes (a flush stall every N
+records). With sync logging a stall blocks every in-flight request;
+with the queue only the writer thread waits.
+
+    python -m benchmarks.logging_throughput --requests 5000 --concurrency 50 --stall-ms 20 --stall-every 500
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from fastapi import FastAPI
+from app.core import logging as app_logging
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.benchmark")
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/patients/{patient_id}")
+    async def get_patient(patient_id: int):
+        logger.info("Fetching patient with id=%s", patient_id)
+        await asyncio.sleep(0)  # Stands in for the database round trip
+        logger.info("Loaded patient: %s %s (id=%s)", "Ali", "Valiyev", patient_id)
+        logger.info("Patient %s served", patient_id)
+        return {"id": patient_id}
+
+    return app
+
+
+def stall(handler: logging.Handler, stall_ms: float, every: int) -> None:
+    """Make handler sleep stall_ms on every `every`-th record (slow disk flush)."""
+    if not stall_ms:
+        return
+    emit, count = handler.emit, 0
+
+    def stalling_emit(record):
+        nonlocal count
+        count += 1
+        if count % every == 0:
+            time.sleep(stall_ms / 1000)
+        emit(record)
+
+    handler.emit = stalling_emit
+
+
+def configure(mode: str, args) -> None:
+    root = logging.getLogger()
+    root.handlers.clear()
+    settings.LOG_CONSOLE = False
+    settings.LOG_LEVEL = "WARNING" if mode == "off" else "INFO"
+
+    if mode == "sync":
+        handlers = app_logging.build_handlers()
+        for handler in handlers:
+            stall(handler, args.stall_ms, args.stall_every)
+        root.handlers[:] = handlers
+        root.setLevel(logging.INFO)
+        return
+
+    app_logging.setup_logging()
+    for handler in app_logging._listener.handlers:
+        stall(handler, args.stall_ms, args.stall_every)
+
+
+def teardown(mode: str) -> None:
+    if mode == "sync":
+        for handler in logging.getLogger().handlers:
+            handler.close()
+        logging.getLogger().handlers.clear()
+    else:
+        app_logging.shutdown_logging()
+
+
+async def run(mode: str, args) -> None:
+    configure(mode, args)
+    transport = httpx.ASGITransport(app=build_app())
+    latencies = []
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def request(i: int):
+            async with gate:
+                started = time.perf_counter()
+                response = await client.get(f"/patients/{i}")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    teardown(mode)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{mode:>6}  {args.requests / elapsed:>9.0f}  {p50:>8.2f}  {p99:>8.2f}  {latencies[-1] * 1000:>8.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--format", choices=["json", "text"], default=settings.LOG_FORMAT)
+    parser.add_argument("--stall-ms", type=float, default=0.0, help="Simulated write stall")
+    parser.add_argument("--stall-every", type=int, default=500, help="Records between stalls")
+    parser.add_argument("--modes", nargs="+", default=["off", "sync", "queue"])
+    args = parser.parse_args()
+
+    settings.LOG_FORMAT = args.format
+    with tempfile.TemporaryDirectory() as log_dir:
+        settings.LOG_FILE = str(Path(log_dir) / "app.log")
+        print(
+            f"requests={args.requests} concurrency={args.concurrency} format={args.format} "
+            f"stall={args.stall_ms}ms every {args.stall_every} records"
+        )
+        print(f"{'mode':>6}  {'req/sec':>9}  {'p50 ms':>8}  {'p99 ms':>8}  {'max ms':>8}")
+        for mode in args.modes:
+            await run(mode, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
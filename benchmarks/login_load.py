@@ -0,0 +1,108 @@
+"""
+Load test: login spike with bcrypt inline on the event loop vs in the hashing pool.
+
+A small app exposes /login (one bcrypt verification per request, like
+AuthService.login) and /health. While a burst of concurrent logins is
+running, a probe keeps calling /health; its p50/p99 latency shows how much
+the logins stall other endpoints of the same worker. No database needed.
+
+    python -m benchmarks.login_load --logins 200 --concurrency 50 --rounds 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import FastAPI, HTTPException
+from app.core.passwords import PasswordHasher
+
+PASSWORD = "123456"
+PROBE_INTERVAL = 0.005
+
+
+def make_app(hasher: PasswordHasher, password_hash: str, inline: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if inline:
+            valid = hasher.context.verify(PASSWORD, password_hash)
+        else:
+            valid, _ = await hasher.verify(PASSWORD, password_hash)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def run(app: FastAPI, logins: int, concurrency: int) -> tuple[float, list[float]]:
+    """Return (logins per second, /health latencies in ms during the spike)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        gate = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+        latencies: list[float] = []
+
+        async def login():
+            async with gate:
+                response = await client.post("/login")
+                assert response.status_code == 200
+
+        async def probe():
+            # Latency is measured from when each probe was due, so probes
+            # delayed by a blocked event loop are counted (no coordinated omission)
+            due = time.perf_counter()
+            while True:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/health")
+                now = time.perf_counter()
+                latencies.append((now - due) * 1000)
+                if done.is_set():
+                    break
+                while due <= now:
+                    due += PROBE_INTERVAL
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return logins / elapsed, latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool threads")
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers, max_pending=args.concurrency)
+    password_hash = hasher.context.hash(PASSWORD)
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, bcrypt rounds {args.rounds}")
+    for name, inline in (("inline", True), ("pool", False)):
+        rate, latencies = asyncio.run(run(make_app(hasher, password_hash, inline), args.logins, args.concurrency))
+        print(
+            f"  {name:<7} {rate:8.1f} logins/s   /health p50 {statistics.median(latencies):7.1f} ms"
+            f"   p99 {percentile(latencies, 99):7.1f} ms   ({len(latencies)} probes)"
+        )
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
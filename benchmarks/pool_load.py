@@ -0,0 +1,92 @@
+"""
+Load test: where does the connection pool saturate?
+
+Runs `--requests` simulated requests at increasing concurrency. Each
+request checks out a session, holds it for one query taking `--hold-ms`
+(pg_sleep, standing in for a handler's DB work) and releases it. A fresh
+engine with the same pool settings is used per concurrency level, so the
+pool metrics of every level are separate.
+
+Below saturation checkout times stay near zero. Once concurrency exceeds
+pool_size + max_overflow, requests queue for connections: checkout p99
+grows with the queue and, past pool_timeout, requests fail with timeouts.
+
+Usage (against the database from DATABASE_URL):
+
+    python -m benchmarks.pool_load --pool-size 10 --max-overflow 10 --hold-ms 20 \\
+        --concurrency 5 10 20 40 80
+"""
+
+import argparse
+import asyncio
+import time
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.db.pool import CHECKOUT_BUCKETS_MS, pool_stats
+from app.db.session import build_engine
+
+
+def histogram_percentile(stats: dict, pct: float) -> str:
+    """Upper bucket bound holding the pct-th percentile checkout."""
+    target = stats["checkouts"] * pct / 100
+    for bucket in stats["checkout_ms_histogram"]:
+        if bucket["count"] >= target:
+            return f"<={bucket['le']:g}" if bucket["le"] is not None else f">{CHECKOUT_BUCKETS_MS[-1]:g}"
+    return "-"
+
+
+async def run_level(args, concurrency: int) -> None:
+    engine = build_engine(
+        settings.DATABASE_URL,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    gate = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def request():
+        nonlocal failures
+        async with gate:
+            try:
+                async with session_factory() as session:
+                    await session.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": args.hold_ms / 1000})
+            except exc.TimeoutError:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    stats = pool_stats("load", engine)
+    await engine.dispose()
+    print(
+        f"{concurrency:>11}  {(args.requests - failures) / elapsed:>9.0f}  "
+        f"{histogram_percentile(stats, 50):>10}  {histogram_percentile(stats, 99):>10}  "
+        f"{stats['checkout_ms_max']:>9.1f}  {stats['max_checked_out']:>8}  {stats['timeouts']:>8}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hold-ms", type=float, default=20.0, help="Time each request holds its connection")
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    parser.add_argument("--pool-timeout", type=float, default=settings.DB_POOL_TIMEOUT)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[5, 10, 20, 40, 80, 160])
+    args = parser.parse_args()
+
+    print(
+        f"pool_size={args.pool_size} max_overflow={args.max_overflow} pool_timeout={args.pool_timeout}s "
+        f"hold={args.hold_ms}ms requests={args.requests}"
+    )
+    print(f"{'concurrency':>11}  {'req/sec':>9}  {'p50 ms':>10}  {'p99 ms':>10}  {'max ms':>9}  {'max out':>8}  {'timeouts':>8}")
+    for concurrency in args.concurrency:
+        await run_level(args, concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+Benchmark: CPU per request of the response path, stock FastAPI vs fast path.
+
+Serves synthetic data shaped like the patient list and location
+endpoints through the full ASGI stack in-process (no network, no
+database) and reports CPU microseconds per request:
+
+    stock  APIRoute + JSONResponse, stdlib json: returned models are
+           dumped, re-validated against response_model and encoded
+    fast   ModelResponseRoute + FastJSONResponse, orjson: exact response
+           models are encoded once by a prebuilt TypeAdapter
+
+Endpoints:
+
+    patients   GET /patients/ page (RawJSONResponse of dict rows, --page-size items)
+    region     GET /locations/regions/{id} (RegionResponse model)
+    children   GET /locations/nodes/{id}/children (list[LocationResponse], --children items)
+    tree       GET /locations/tree?since_version= (dict via RawJSONResponse)
+
+    python -m benchmarks.response_serialization --requests 2000 --page-size 50 --children 300
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from app.core.responses import FastJSONResponse, RawJSONResponse
+from app.core.routing import ModelResponseRoute
+from app.schemas.location import LocationResponse, LocationTree, RegionResponse
+from app.schemas.patient import PatientPage
+from app.utils import serialization
+
+ENDPOINTS = {
+    "patients": "/patients/",
+    "region": "/locations/regions/1",
+    "children": "/locations/nodes/1/children",
+    "tree": "/locations/tree",
+}
+
+
+def patient_page(size: int) -> dict:
+    created_at = datetime(2026, 1, 15, 9, 30, tzinfo=timezone.utc)
+    items = [
+        {
+            "id": i,
+            "first_name": "Aziz",
+            "last_name": f"Karimov{i}",
+            "middle_name": "Olimovich",
+            "birth_date": date(1990, 1, 1 + i % 28),
+            "gender": "male",
+            "phone": "+998901234567",
+            "medical_card": {"card_number": f"{i:010d}", "id": i, "patient_id": i, "created_at": created_at},
+        }
+        for i in range(size)
+    ]
+    return {"items": items, "limit": size, "next_cursor": "eyJrIjpbMV19", "prev_cursor": None}
+
+
+def build_app(route_class: type[APIRoute], response_class: type[JSONResponse], args) -> FastAPI:
+    page = patient_page(args.page_size)
+    region = RegionResponse(id=1, name="Toshkent shahri")
+    children = [
+        LocationResponse(id=100 + i, parent_id=1, level="mahalla", name=f"Mahalla {i}")
+        for i in range(args.children)
+    ]
+    tree = {
+        "version": 42,
+        "full": False,
+        "regions": [
+            {"id": r, "name": f"Viloyat {r}", "cities": [
+                {"id": r * 100 + c, "name": f"Tuman {c}", "region_id": r} for c in range(15)
+            ]}
+            for r in range(1, 15)
+        ],
+    }
+
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/patients/", response_model=PatientPage)
+    async def get_patients():
+        return RawJSONResponse(page)
+
+    @router.get("/locations/regions/{region_id}", response_model=RegionResponse)
+    async def get_region(region_id: int):
+        return region
+
+    @router.get("/locations/nodes/{location_id}/children", response_model=list[LocationResponse])
+    async def get_location_children(location_id: int):
+        return children
+
+    @router.get("/locations/tree", response_model=LocationTree)
+    async def get_location_tree():
+        return RawJSONResponse(tree)
+
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """Run one GET through the ASGI app, return the body size."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, int]:
+    """CPU microseconds per request and body size."""
+    size = await call(app, path)  # Warm up
+    started = time.process_time()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.process_time() - started) / requests * 1e6, size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--children", type=int, default=300)
+    args = parser.parse_args()
+
+    stock = build_app(APIRoute, JSONResponse, args)
+    fast = build_app(ModelResponseRoute, FastJSONResponse, args)
+    orjson = serialization.orjson
+
+    print(f"requests={args.requests} page_size={args.page_size} children={args.children} orjson={orjson is not None}")
+    print(f"{'endpoint':>9}  {'bytes':>7}  {'stock us':>9}  {'fast us':>9}  {'saved':>6}")
+    for name, path in ENDPOINTS.items():
+        serialization.orjson = None
+        stock_us, size = await measure(stock, path, args.requests)
+        serialization.orjson = orjson
+        fast_us, _ = await measure(fast, path, args.requests)
+        print(f"{name:>9}  {size:>7}  {stock_us:>9.1f}  {fast_us:>9.1f}  {1 - fast_us / stock_us:>6.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
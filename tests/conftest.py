@@ -0,0 +1,14 @@
+"""
+Shared test setup.
+
+Declared statement budgets raise in tests (QUERY_BUDGET_MODE=raise), so an
+endpoint exceeding its @endpoint_budget fails the test instead of logging.
+Database tests use TEST_DATABASE_URL when set.
+"""
+
+import os
+
+# Before app.core.config builds the settings
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
@@ -0,0 +1,186 @@
+"""
+Declared endpoint statement budgets, checked against PostgreSQL.
+
+QUERY_BUDGET_MODE is "raise" in tests (see conftest.py), so an endpoint
+running more statements than its @endpoint_budget fails the request.
+Needs a migrated database (alembic upgrade head); skipped when it is
+not reachable.
+"""
+
+import uuid
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.location import Location, LocationClosure
+
+ADMIN = (settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD)
+
+
+@pytest_asyncio.fixture
+async def client():
+    try:
+        async with engine.connect():
+            pass
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL not reachable: {e}")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test/api/v1") as client:
+        yield client
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+def new_jshshir() -> str:
+    return f"{uuid.uuid4().int % 10 ** 14:014d}"
+
+
+async def create_user(client: AsyncClient, roles: list[str]) -> dict:
+    response = await client.post("/admin/users/", auth=ADMIN, json={
+        "full_name": f"Budget Test {uuid.uuid4().hex[:8]}",
+        "jshshir": new_jshshir(),
+        "roles": roles,
+        "gender": "female",
+        "birth_date": "1985-04-12",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def login(client: AsyncClient, user: dict) -> dict:
+    response = await client.post("/auth/login", json={"jshshir": user["jshshir"], "password": user["password"]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_user_and_auth_endpoints(client):
+    user = await create_user(client, ["manager"])
+    user_ids = [user["id"]]
+    try:
+        assert (await client.get(f"/admin/users/{user['id']}", auth=ADMIN)).status_code == 200
+        assert (await client.get("/admin/users/", params={"role": "manager"}, auth=ADMIN)).status_code == 200
+
+        # First login migrates the plain password to a hash
+        tokens = await login(client, user)
+        response = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200, response.text
+        assert (await client.post("/auth/logout", headers=bearer(response.json()))).status_code == 204
+
+        await login(client, user)
+        # Role change revokes the user's sessions
+        response = await client.put(f"/admin/users/{user['id']}", auth=ADMIN, json={"roles": ["shifokor"]})
+        assert response.status_code == 200, response.text
+        assert (await client.post(f"/admin/users/{user['id']}/revoke-sessions", auth=ADMIN)).status_code == 200
+
+        roster = "full_name,jshshir,roles,gender,birth_date,phone\n" + "\n".join([
+            f"{user['full_name']},{user['jshshir']},manager,female,1985-04-12,",
+            f"Budget Test Roster,{new_jshshir()},shifokor;manager,male,1990-02-03,",
+        ])
+        response = await client.post(
+            "/admin/users/import", auth=ADMIN, files={"file": ("roster.csv", roster, "text/csv")}
+        )
+        assert response.status_code == 200, response.text
+        result = response.json()
+        user_ids += [created["id"] for created in result["created_users"]]
+        assert (result["created"], result["updated"]) == (1, 1)
+    finally:
+        for user_id in user_ids:
+            assert (await client.delete(f"/admin/users/{user_id}", auth=ADMIN)).status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_patient_endpoints(client):
+    manager = await create_user(client, ["manager"])
+    headers = bearer(await login(client, manager))
+    last_name = f"Budget{uuid.uuid4().hex[:8]}"
+    try:
+        response = await client.post("/patients/", headers=headers, json={
+            "first_name": "Ali", "last_name": last_name, "birth_date": "2001-09-30", "gender": "male",
+        })
+        assert response.status_code == 201, response.text
+        patient = response.json()
+
+        assert (await client.get(f"/patients/{patient['id']}", headers=headers)).status_code == 200
+        response = await client.get("/patients/", headers=headers, params={"search": last_name, "limit": 1})
+        assert [item["id"] for item in response.json()["items"]] == [patient["id"]]
+        response = await client.get(
+            "/patients/", headers=headers, params={"search": f"Ali {last_name}", "search_mode": "fuzzy"}
+        )
+        assert response.status_code == 200, response.text
+
+        response = await client.put(f"/patients/{patient['id']}", headers=headers, json={"phone": "+998901234567"})
+        assert response.status_code == 200, response.text
+        response = await client.patch(f"/patients/{patient['id']}", headers=headers, json={"first_name": "Vali"})
+        assert response.status_code == 200, response.text
+
+        response = await client.get("/patients/export", headers=headers, params={"format": "csv", "search": last_name})
+        assert response.status_code == 200 and last_name in response.text
+        assert (await client.get("/admin/medical-cards/utilization", auth=ADMIN)).status_code == 200
+
+        assert (await client.delete(f"/patients/{patient['id']}", headers=headers)).status_code == 204
+    finally:
+        await client.delete(f"/admin/users/{manager['id']}", auth=ADMIN)
+
+
+@pytest.mark.asyncio
+async def test_import_endpoints(client):
+    response = await client.post("/admin/import-regions", auth=ADMIN)
+    assert response.status_code == 200, response.text
+
+    last_name = f"Budget{uuid.uuid4().hex[:8]}"
+    rows = "\n".join(
+        [f'{{"first_name": "P{i}", "last_name": "{last_name}", "birth_date": "1970-01-01", "gender": "male"}}'
+         for i in range(3)]
+    )
+    response = await client.post(
+        "/admin/patients/import", auth=ADMIN, files={"file": ("patients.jsonl", rows, "application/x-ndjson")}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 3
+
+    manager = await create_user(client, ["manager"])
+    headers = bearer(await login(client, manager))
+    try:
+        response = await client.get("/patients/", headers=headers, params={"search": last_name})
+        for item in response.json()["items"]:
+            assert (await client.delete(f"/patients/{item['id']}", headers=headers)).status_code == 204
+    finally:
+        await client.delete(f"/admin/users/{manager['id']}", auth=ADMIN)
+
+
+@pytest.mark.asyncio
+async def test_location_endpoints(client):
+    assert (await client.post("/admin/import-regions", auth=ADMIN)).status_code == 200
+
+    response = await client.get("/locations/tree")
+    assert response.status_code == 200, response.text
+    region = response.json()["regions"][0]
+    for path in (
+        "/locations/regions/", f"/locations/regions/{region['id']}",
+        f"/locations/regions/{region['id']}/cities/", "/locations/cities/",
+    ):
+        assert (await client.get(path)).status_code == 200, path
+
+    async with AsyncSessionLocal() as db:
+        district_id = await db.scalar(select(Location.id).where(Location.level == "district").limit(1))
+    assert (await client.get(f"/locations/nodes/{district_id}")).status_code == 200
+    assert (await client.get(f"/locations/nodes/{district_id}/children")).status_code == 200
+
+    location = {"parent_id": district_id, "name": f"Budget {uuid.uuid4().hex[:8]}"}
+    response = await client.post("/admin/locations", auth=ADMIN, json=location)
+    assert response.status_code == 201, response.text
+    assert (await client.post("/admin/locations", auth=ADMIN, json=location)).status_code == 422
+    async with AsyncSessionLocal() as db:
+        node_id = response.json()["id"]
+        await db.execute(delete(LocationClosure).where(LocationClosure.descendant_id == node_id))
+        await db.execute(delete(Location).where(Location.id == node_id))
+        await db.commit()
@@ -0,0 +1,59 @@
+"""
+Bulk patient import against PostgreSQL.
+
+Needs a migrated database (alembic upgrade head) at TEST_DATABASE_URL,
+falling back to DATABASE_URL; skipped when it is not reachable.
+"""
+
+import io
+import os
+import uuid
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.db.session import build_engine
+from app.models.medical_card import MedicalCard
+from app.models.patient import Patient
+from app.services.patient_import import PatientImportService
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL", settings.DATABASE_URL)
+
+
+@pytest.mark.asyncio
+async def test_import_spanning_several_batches(monkeypatch):
+    # Two pooled connections handed out FIFO: consecutive batches run on different ones
+    engine = build_engine(DATABASE_URL, pool_size=2, max_overflow=0)
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            pass
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL not reachable: {e}")
+
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 3)
+    last_name = f"Import-{uuid.uuid4().hex[:8]}"
+    rows = ["first_name,last_name,birth_date,gender"]
+    rows += [f"Patient{i},{last_name},1990-01-{i + 1:02d},male" for i in range(8)]
+    rows.append(f"Broken,{last_name},not-a-date,male")
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with sessions() as db:
+            result = await PatientImportService(db).import_patients(io.StringIO("\n".join(rows)), "csv")
+
+        assert (result.total_rows, result.imported, result.failed) == (9, 8, 1)
+        assert [error.line for error in result.errors] == [10]
+
+        async with sessions() as db:
+            card_numbers = (await db.execute(
+                select(MedicalCard.card_number).join(Patient).where(Patient.last_name == last_name)
+            )).scalars().all()
+        assert len(set(card_numbers)) == 8
+    finally:
+        async with sessions() as db:
+            patient_ids = select(Patient.id).where(Patient.last_name == last_name)
+            await db.execute(delete(MedicalCard).where(MedicalCard.patient_id.in_(patient_ids)))
+            await db.execute(delete(Patient).where(Patient.last_name == last_name))
+            await db.commit()
+        await engine.dispose()
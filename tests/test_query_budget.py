@@ -0,0 +1,132 @@
+"""Statement budgets and the N+1 detector, counted on an instrumented SQLite engine."""
+
+import logging
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+from app.db.instrumentation import SQLStatsMiddleware, fingerprint, install_sql_instrumentation
+from app.db.query_budget import QueryBudgetExceeded, endpoint_budget, query_budget
+
+
+@pytest.fixture
+def connection():
+    # One shared in-memory connection, usable from TestClient's thread as well
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # install_sql_instrumentation only needs .sync_engine of an AsyncEngine
+    install_sql_instrumentation(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def run(connection, count: int) -> None:
+    for _ in range(count):
+        connection.execute(text("SELECT 1"))
+
+
+def test_within_budget(connection):
+    with query_budget(2) as budget:
+        run(connection, 2)
+    assert budget.used == 2
+
+
+def test_exceeded_raises(connection):
+    with pytest.raises(QueryBudgetExceeded, match="check ran 3 statements, budget 2$"):
+        with query_budget(2, "check"):
+            run(connection, 3)
+
+
+def test_exceeded_lists_repeated_statements(connection, monkeypatch):
+    monkeypatch.setattr(settings, "N_PLUS_ONE_DETECTION", True)
+    with pytest.raises(QueryBudgetExceeded, match=r"budget 2; repeated: 3x SELECT \?"):
+        with query_budget(2):
+            run(connection, 3)
+
+
+def test_error_of_code_path_takes_precedence(connection):
+    with pytest.raises(ZeroDivisionError):
+        with query_budget(0):
+            run(connection, 1)
+            1 / 0
+
+
+def test_nested_budgets_count_their_own_statements(connection):
+    with query_budget(3) as outer:
+        run(connection, 1)
+        with query_budget(2) as inner:
+            run(connection, 2)
+    assert (outer.used, inner.used) == (3, 2)
+
+    with pytest.raises(QueryBudgetExceeded, match="inner"):
+        with query_budget(10):
+            with query_budget(1, "inner"):
+                run(connection, 2)
+
+
+def test_decorator_labels_with_function_name(connection):
+    @query_budget(1)
+    def two_statements():
+        run(connection, 2)
+
+    with pytest.raises(QueryBudgetExceeded, match="two_statements ran 2 statements"):
+        two_statements()
+
+
+@pytest.mark.asyncio
+async def test_async_decorator(connection):
+    @query_budget(1)
+    async def one_statement():
+        run(connection, 1)
+        return "done"
+
+    @query_budget(1)
+    async def two_statements():
+        run(connection, 2)
+
+    assert await one_statement() == "done"
+    with pytest.raises(QueryBudgetExceeded):
+        await two_statements()
+
+
+@pytest.mark.parametrize("mode, raises", [("raise", True), ("log", False), ("off", False)])
+def test_endpoint_budget_follows_settings(connection, monkeypatch, mode, raises):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", mode)
+
+    @endpoint_budget(1)
+    def endpoint():
+        run(connection, 2)
+
+    if raises:
+        with pytest.raises(QueryBudgetExceeded):
+            endpoint()
+    else:
+        endpoint()
+
+
+
+def test_n_plus_one_detector_logs_repeated_shapes(connection, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "N_PLUS_ONE_DETECTION", True)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 3)
+    app = FastAPI()
+    app.add_middleware(SQLStatsMiddleware)
+
+    @app.get("/items/{count}")
+    def get_items(count: int):
+        for item_id in range(count):
+            connection.execute(text("SELECT :id"), {"id": item_id})
+        return {}
+
+    client = TestClient(app)
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        response = client.get("/items/2")
+        assert caplog.records == []
+        assert '"2 queries"' in response.headers["server-timing"]
+
+        client.get("/items/3")
+    assert [record.getMessage() for record in caplog.records] == [
+        "N+1 suspect: GET /items/{count} ran 3x [%s] SELECT ?" % fingerprint("SELECT ?")
+    ]